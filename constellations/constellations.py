@@ -1,8 +1,24 @@
+import numpy as np
 from constellations.constellations_parser import read_constellations
-from stars.stars_coords_2d import angular_distance
+from stars.stars_coords_2d import angular_distance_batch
 
 MAX_ANGULAR_DISTANCE = 150  # Maximum angular distance (in degrees) from center for visibility
 
+
+def distance_mask(star_lookup, RA0, Dec0, sky_index=None):
+    """
+    Mask over the StarField of the stars in a lookup of the stars within MAX_ANGULAR_DISTANCE
+    of a center, from a cone search of the sky index if given, else from the angular distance
+    of every star of the field. None if the lookup is empty.
+    """
+    if sky_index is not None:
+        return sky_index.cone_mask(RA0, Dec0, MAX_ANGULAR_DISTANCE)
+    if not star_lookup:
+        return None
+    field = next(iter(star_lookup.values())).field
+    return angular_distance_batch(field.ra_deg, field.dec_deg, RA0, Dec0) <= MAX_ANGULAR_DISTANCE
+
+
 class Constellation():
     """
     Represents a constellation, defined by a sequence of HR star numbers.
@@ -20,7 +36,7 @@ class Constellation():
     def __repr__(self):
         return (f"Constellation {self.name}: ({self.hr_sequence})")
 
-    def bind_stars(self, star_lookup, RA0=None, Dec0=None):
+    def bind_stars(self, star_lookup, RA0=None, Dec0=None, *, within=None, sky_index=None):
         """
         Populate self.stars with actual Star instances from a lookup dictionary.
         Optionally filters stars based on angular distance from a center point.
@@ -29,32 +45,46 @@ class Constellation():
             star_lookup (dict): Dictionary mapping HR number to Star object.
             RA0 (float): Optional RA center (for filtering)
             Dec0 (float): Optional Dec center (for filtering)
+            within (numpy.ndarray): Optional precomputed mask over the StarField of the stars
+                close enough to the center (see SkyIndex.cone_mask); replaces RA0/Dec0 when binding
+                many constellations around the same center.
+            sky_index (SkyIndex): Optional index over the stars' field for the RA0/Dec0 filter;
+                without one, only the constellation's own stars are measured.
         """
+        measure = within is None and RA0 is not None and Dec0 is not None
+        if measure and sky_index is not None:
+            within = sky_index.cone_mask(RA0, Dec0, MAX_ANGULAR_DISTANCE)
+            measure = False
+
         self.stars = []
         total_expected = len(self.hr_sequence)
 
         for hr in self.hr_sequence:
             star = star_lookup.get(hr)
             if star:
-                if RA0 is not None and Dec0 is not None:
-                    # Optionally filter stars by angular distance to avoid clutter
-                    ad = angular_distance(star.ra_deg, star.dec_deg, RA0, Dec0)
-                    if ad > MAX_ANGULAR_DISTANCE:
-                        continue
+                # Optionally filter stars by angular distance to avoid clutter
+                if within is not None and not within[star.index]:
+                    continue
                 self.stars.append(star)
 
+        if measure and self.stars:
+            distance = angular_distance_batch(np.array([star.ra_deg for star in self.stars]),
+                                              np.array([star.dec_deg for star in self.stars]), RA0, Dec0)
+            self.stars = [star for star, d in zip(self.stars, distance.tolist()) if d <= MAX_ANGULAR_DISTANCE]
+
         # Invalidate constellation if any star couldn't be matched
         if len(self.stars) != total_expected:
             self.stars = []
 
 
-def load_constellations(star_lookup, RA0=None, Dec0=None):
+def load_constellations(star_lookup, RA0=None, Dec0=None, sky_index=None):
     """"
     Load constellation definitions and attach corresponding Star instances.
 
     Parameters:
         star_lookup (dict): Dictionary mapping HR numbers to Star instances.
         RA0, Dec0 (float): Optional center coordinates for filtering.
+        sky_index (SkyIndex): Optional index over the stars' field used for filtering.
 
     Returns:
         list: List of Constellation instances with stars bound.
@@ -62,11 +92,46 @@ def load_constellations(star_lookup, RA0=None, Dec0=None):
     raw_list = read_constellations()
     constellations = []
 
+    # One cone search for all the constellations
+    within = None
+    if RA0 is not None and Dec0 is not None:
+        within = distance_mask(star_lookup, RA0, Dec0, sky_index)
+
     for entry in raw_list:
         name = entry["Name"]
         hr_seq = entry["HR_sequence"]
         c = Constellation(name, hr_seq)
-        c.bind_stars(star_lookup, RA0, Dec0)
+        c.bind_stars(star_lookup, within=within)
         constellations.append(c)
 
-    return constellations
\ No newline at end of file
+    return constellations
+
+
+def rebind_constellations(constellations, stars, sky_index, RA0, Dec0):
+    """
+    Bind the constellations again for a new projection center, as bind_stars would.
+
+    The stars close enough to the center come from one cone search, and a constellation's
+    stars are only replaced if it gains or loses them, so this is cheap enough to run on
+    every frame of a pan.
+
+    Parameters:
+        constellations (list): Constellation instances.
+        stars (StarField): Stars to bind to.
+        sky_index (SkyIndex): Index over the same stars.
+        RA0, Dec0 (float): New center coordinates for filtering.
+
+    Returns:
+        int: Number of constellations whose stars changed.
+    """
+    within = sky_index.cone_mask(RA0, Dec0, MAX_ANGULAR_DISTANCE)
+
+    changed = 0
+    for constellation in constellations:
+        indices = [stars.lookup.get(hr) for hr in constellation.hr_sequence]
+        bound = bool(indices) and None not in indices and bool(within[indices].all())
+        if bound == bool(constellation.stars):
+            continue
+        constellation.stars = [stars[i] for i in indices] if bound else []
+        changed += 1
+    return changed
@@ -0,0 +1,101 @@
+import numpy as np
+
+
+class ConstellationEdges():
+    """
+    Constellation lines compiled into index buffers over a StarField.
+
+    Every distinct segment is kept once, even if a sequence retraces it or two constellations share it.
+    The remaining segments are chained back into polylines following the original sequences,
+    so each run of new segments can be drawn with a single call.
+
+    Attributes:
+        stars (StarField): Stars the indices refer to.
+        edges (numpy.ndarray): (E, 2) star indices of the unique segments.
+        vertices (numpy.ndarray): Star indices of all polylines, one after another.
+        offsets (numpy.ndarray): Polyline i spans vertices[offsets[i]:offsets[i + 1]].
+        segment_starts (numpy.ndarray): Position k in vertices of every segment (vertices[k], vertices[k + 1]).
+        segment_polyline (numpy.ndarray): Polyline each segment belongs to.
+        bounds (numpy.ndarray): (P, 4) base-coordinate bounding box (xmin, xmax, ymin, ymax) of each polyline.
+        stats (dict): Number of "segments" in the sequences, unique "edges" kept and duplicates "removed".
+    """
+    def __init__(self, edges, polylines, stars):
+        self.stars = stars
+        self.edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+        lengths = [len(polyline) for polyline in polylines]
+        self.offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+        self.vertices = np.array([i for polyline in polylines for i in polyline], dtype=np.int64)
+
+        # Every vertex but the last of its polyline starts a segment
+        self.segment_polyline = np.repeat(np.arange(len(polylines), dtype=np.int64), np.array(lengths, dtype=np.int64) - 1)
+        last = np.zeros(len(self.vertices), dtype=bool)
+        last[self.offsets[1:] - 1] = True
+        self.segment_starts = np.flatnonzero(~last)
+
+        self.update_bounds()
+
+        self.stats = {"segments": 0, "edges": len(self.edges), "removed": 0}
+
+    def __repr__(self):
+        return (f"ConstellationEdges ({len(self.edges)} edges in {len(self)} polylines)")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def update_bounds(self):
+        """
+        Recompute the bounding box of every polyline from the base coordinates of the stars
+        (e.g. after they were reprojected).
+        """
+        self.bounds = np.empty((len(self), 4))
+        if not len(self):
+            return
+        x = self.stars.base[self.vertices, 0]
+        y = self.stars.base[self.vertices, 1]
+        starts = self.offsets[:-1]
+        self.bounds[:, 0] = np.minimum.reduceat(x, starts)
+        self.bounds[:, 1] = np.maximum.reduceat(x, starts)
+        self.bounds[:, 2] = np.minimum.reduceat(y, starts)
+        self.bounds[:, 3] = np.maximum.reduceat(y, starts)
+
+
+def compile_edges(constellations, stars):
+    """
+    Compile the star sequences of all constellations into deduplicated edge buffers.
+
+    Parameters:
+        constellations (list): Constellation instances with bound stars.
+        stars (StarField): Stars the constellations are bound to.
+
+    Returns:
+        ConstellationEdges: The compiled edges and polylines.
+    """
+    seen = set()
+    edges = []
+    polylines = []
+    segments = 0
+
+    for constellation in constellations:
+        sequence = [star.index for star in constellation.stars]
+        polyline = []
+        for a, b in zip(sequence, sequence[1:]):
+            segments += 1
+            key = (a, b) if a < b else (b, a)
+            if a == b or key in seen:
+                # Already drawn: end the current polyline here
+                if len(polyline) > 1:
+                    polylines.append(polyline)
+                polyline = []
+                continue
+            seen.add(key)
+            edges.append(key)
+            if not polyline:
+                polyline = [a]
+            polyline.append(b)
+        if len(polyline) > 1:
+            polylines.append(polyline)
+
+    compiled = ConstellationEdges(edges, polylines, stars)
+    compiled.stats["segments"] = segments
+    compiled.stats["removed"] = segments - len(edges)
+    return compiled
@@ -0,0 +1,216 @@
+import os
+import argparse
+import io
+import json
+import math
+import queue
+import threading
+import time
+from export.workers import WORKER, worker_pool
+import pygame
+from renderer.scene import initial_state
+
+FRAMES_DIR = "frames"
+DEFAULT_FPS = 30
+DEFAULT_SIZE = (1280, 720)
+FORMATS = ("png", "tga", "bmp", "jpg")  # PNG is the smallest but by far the slowest to encode
+QUEUE_SIZE = 32           # Rendered frames waiting to be saved; rendering pauses when it is full
+PROGRESS_INTERVAL = 1.0   # Seconds between progress lines
+
+# View values interpolated between keyframes; the zoom is interpolated on a log scale
+LINEAR_KEYS = ("angle", "tx", "ty", "shx", "shy", "pan_ra", "pan_dec")
+LOG_KEYS = ("scale",)
+# The other values (reflections and display toggles) keep the value of the last keyframe reached
+
+
+def load_script(filepath):
+    """
+    Read a keyframe script.
+
+    The script is a JSON object with the keyframes and optionally "fps" and "size":
+
+        {"fps": 30, "size": [1280, 720],
+         "keyframes": [{"time": 0, "scale": 0.4}, {"time": 4, "scale": 2.0, "angle": 90}]}
+
+    Each keyframe has a "time" in seconds and any state values; values left out
+    carry over from the previous keyframe (or the initial state).
+
+    Returns:
+        dict: The script, keyframes sorted by time.
+    """
+    with open(filepath) as f:
+        script = json.load(f)
+    script["keyframes"] = sorted(script["keyframes"], key=lambda k: k["time"])
+    return script
+
+
+def resolve_keyframes(keyframes):
+    """
+    Fill in every state value of every keyframe, carrying values over from the previous one.
+    """
+    state = initial_state()
+    state["overlay"] = False
+    resolved = []
+    for keyframe in keyframes:
+        state = dict(state)
+        state.update({k: v for k, v in keyframe.items() if k != "time"})
+        state["time"] = keyframe["time"]
+        resolved.append(state)
+    return resolved
+
+
+def interpolate(a, b, t):
+    """
+    View state a fraction t of the way from keyframe a to keyframe b.
+    """
+    state = dict(a)
+    del state["time"]
+    for k in LINEAR_KEYS:
+        state[k] = a[k] + (b[k] - a[k]) * t
+    for k in LOG_KEYS:
+        state[k] = a[k] * (b[k] / a[k]) ** t
+    return state
+
+
+def frame_states(keyframes, fps):
+    """
+    Interpolate the state of every frame of a keyframe script.
+
+    Parameters:
+        keyframes (list): Keyframes sorted by time (see load_script).
+        fps (float): Frames per second of the output.
+
+    Returns:
+        list: One state dict per frame.
+    """
+    keyframes = resolve_keyframes(keyframes)
+    start, end = keyframes[0]["time"], keyframes[-1]["time"]
+    count = int(math.floor((end - start) * fps)) + 1
+
+    states = []
+    k = 0
+    for i in range(count):
+        time_s = start + i / fps
+        while k + 1 < len(keyframes) - 1 and keyframes[k + 1]["time"] <= time_s:
+            k += 1
+        a = keyframes[k]
+        b = keyframes[min(k + 1, len(keyframes) - 1)]
+        span = b["time"] - a["time"]
+        t = min(1.0, (time_s - a["time"]) / span) if span > 0 else 0.0
+        states.append(interpolate(a, b, t))
+    return states
+
+
+def render_frame(frame):
+    """
+    Render and encode one frame in a worker.
+
+    Encoding happens here rather than in the parent, so it runs in parallel across the workers.
+
+    Parameters:
+        frame (tuple): (index, state).
+
+    Returns:
+        tuple: (index, encoded image bytes).
+    """
+    index, state = frame
+    scene = WORKER["scene"]
+    surface = WORKER["surface"]
+    scene.draw(surface, state, scene.update(state))
+
+    encoded = io.BytesIO()
+    pygame.image.save(surface, encoded, f"frame.{WORKER['format']}")
+    return index, encoded.getvalue()
+
+
+def save_frames(frames, out_dir, image_format):
+    """
+    Saver thread: write the encoded frames put on the queue to disk, until it gets None.
+    """
+    while True:
+        item = frames.get()
+        if item is None:
+            return
+        index, data = item
+        with open(os.path.join(out_dir, f"frame_{index:05d}.{image_format}"), "wb") as f:
+            f.write(data)
+
+
+def export_animation(script, out_dir=FRAMES_DIR, workers=None, savers=1, image_format="png"):
+    """
+    Render a keyframe script to a numbered image sequence.
+
+    Frames are rendered and encoded by a pool of worker processes, in order, and handed to
+    saver threads through a bounded queue, so writing overlaps with rendering. Each worker
+    gets runs of consecutive frames, which keeps its cached star coordinates and text useful.
+
+    Parameters:
+        script (dict): Keyframe script (see load_script).
+        out_dir (str): Directory the frame_NNNNN files are written to.
+        workers (int): Number of render processes (default: one per CPU).
+        savers (int): Number of threads writing frames.
+        image_format (str): One of FORMATS.
+
+    Returns:
+        int: Number of frames written.
+    """
+    fps = script.get("fps", DEFAULT_FPS)
+    size = tuple(script.get("size", DEFAULT_SIZE))
+    states = frame_states(script["keyframes"], fps)
+    total = len(states)
+    workers = workers or os.cpu_count()
+    os.makedirs(out_dir, exist_ok=True)
+
+    print(f"Rendering {total} frames ({total / fps:.1f} s at {fps} fps, {size[0]}x{size[1]}) "
+          f"with {workers} workers to {out_dir}/")
+
+    frames = queue.Queue(maxsize=QUEUE_SIZE)
+    threads = [threading.Thread(target=save_frames, args=(frames, out_dir, image_format)) for _ in range(savers)]
+    for thread in threads:
+        thread.start()
+
+    start = last_report = time.perf_counter()
+    done = 0
+    chunk_size = max(1, total // (workers * 8))
+    try:
+        with worker_pool(workers, size, {"format": image_format}) as pool:
+            for item in pool.imap(render_frame, enumerate(states), chunksize=chunk_size):
+                frames.put(item)
+                done += 1
+                now = time.perf_counter()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    print(f"  {done}/{total} frames ({100 * done / total:.0f}%), {done / (now - start):.1f} fps")
+                    last_report = now
+    finally:
+        for _ in threads:
+            frames.put(None)
+        for thread in threads:
+            thread.join()
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed
+    print(f"Wrote {total} frames in {elapsed:.1f} s ({rate:.1f} fps, {rate / fps:.1f}x real time)")
+    return total
+
+
+def main():
+    """
+    Command line entry point for the animation export.
+    """
+    parser = argparse.ArgumentParser(description="Render a keyframe script to a PNG image sequence.")
+    parser.add_argument("script", help="JSON keyframe script.")
+    parser.add_argument("--out", default=FRAMES_DIR, help="Output directory.")
+    parser.add_argument("--workers", type=int, help="Number of render processes (default: one per CPU).")
+    parser.add_argument("--savers", type=int, default=1, help="Number of threads writing frames.")
+    parser.add_argument("--format", choices=FORMATS, default="png", help="Image format of the frames.")
+    parser.add_argument("--fps", type=float, help="Override the frames per second of the script.")
+    args = parser.parse_args()
+
+    script = load_script(args.script)
+    if args.fps:
+        script["fps"] = args.fps
+    export_animation(script, args.out, args.workers, args.savers, args.format)
+
+
+if __name__ == '__main__':
+    main()
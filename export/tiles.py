@@ -0,0 +1,173 @@
+import os
+import argparse
+import math
+import time
+import numpy as np
+from export.workers import WORKER, worker_pool
+import pygame
+from stars.catalog_cache import load_catalog
+from renderer.scene import SCALE, initial_state
+
+TILE_SIZE = 256
+TILES_DIR = "tiles"
+WORLD_PERCENTILE = 99.5   # The map covers this share of the stars; the rest falls outside the pyramid
+METATILE = 4              # Tiles are rendered in blocks of METATILE x METATILE and then cut apart
+CLIP_TILES = 4            # Constellation lines are clipped this many tile sides beyond a block
+CHUNK_SIZE = 1            # Blocks handed to a worker at a time
+PROGRESS_INTERVAL = 1.0   # Seconds between progress lines
+
+
+def world_half_size(x, y, percentile=WORLD_PERCENTILE):
+    """
+    Half the side of the square, centered on the projection center, that the tile pyramid covers.
+
+    Parameters:
+        x, y (numpy.ndarray): Base projected star coordinates.
+        percentile (float): Share of the stars (by distance from the center) kept inside.
+    """
+    return float(np.percentile(np.maximum(np.abs(x), np.abs(y)), percentile))
+
+
+def tile_view(z, x, y, half, tile_size=TILE_SIZE):
+    """
+    Return the view of a tile: the pixel position of the projection center and the zoom level.
+
+    At level z the square of side 2 * half is split into 2**z by 2**z tiles, so a base unit
+    spans tile_size * 2**z / (2 * half) pixels. Like in the map, x grows to the left of the
+    projection center and y upwards.
+
+    The view matrix scales by the zoom level and the drawing scale multiplies by SCALE times
+    the zoom level again, so the zoom level is the square root of pixels per unit over SCALE.
+
+    Returns:
+        tuple: (center, zoom) for Scene.draw and the "scale" state value.
+    """
+    pixel_scale = tile_size * 2 ** z / (2 * half)
+    center = (half * pixel_scale - x * tile_size, half * pixel_scale - y * tile_size)
+    return center, math.sqrt(pixel_scale / SCALE)
+
+
+def pyramid_blocks(min_zoom, max_zoom, metatile=METATILE):
+    """
+    Yield (z, bx, by) for every block of metatile x metatile tiles of the pyramid, level by level.
+    Levels with fewer tiles than a block are a single block.
+    """
+    for z in range(min_zoom, max_zoom + 1):
+        blocks = max(1, 2 ** z // metatile)
+        for bx in range(blocks):
+            for by in range(blocks):
+                yield z, bx, by
+
+
+def pyramid_size(min_zoom, max_zoom):
+    """
+    Number of tiles in the pyramid levels min_zoom to max_zoom.
+    """
+    return sum(4 ** z for z in range(min_zoom, max_zoom + 1))
+
+
+def render_block(block):
+    """
+    Render a block of tiles in a worker and save each tile as out_dir/z/x/y.png.
+
+    The block is drawn in one go, so lines and labels crossing the tiles inside it line up
+    exactly. Only the stars and constellations within the block bounds (plus the culling
+    margin, so nothing is cut at the edges) are drawn.
+
+    Returns:
+        int: Number of tiles written.
+    """
+    z, bx, by = block
+    scene = WORKER["scene"]
+    tile_size = WORKER["tile_size"]
+    center, zoom = tile_view(z, bx * METATILE, by * METATILE, WORKER["half"], tile_size)
+
+    state = initial_state()
+    state.update(WORKER["display"])
+    state["scale"] = zoom
+    state["overlay"] = False
+
+    # Every block of a level has the same view, so this only transforms the stars once per level
+    matrix = scene.update(state)
+    surface = WORKER["surface"]
+    scene.draw(surface, state, matrix, center=center)
+
+    count = min(METATILE, 2 ** z)
+    for i in range(count):
+        x = bx * METATILE + i
+        directory = os.path.join(WORKER["out_dir"], str(z), str(x))
+        os.makedirs(directory, exist_ok=True)
+        for j in range(count):
+            y = by * METATILE + j
+            tile = surface.subsurface((i * tile_size, j * tile_size, tile_size, tile_size))
+            pygame.image.save(tile, os.path.join(directory, f"{y}.png"))
+    return count * count
+
+
+def export_tiles(out_dir=TILES_DIR, min_zoom=0, max_zoom=3, tile_size=TILE_SIZE, workers=None, display=None):
+    """
+    Render the tile pyramid across a pool of worker processes.
+
+    Parameters:
+        out_dir (str): Directory the z/x/y.png tiles are written to.
+        min_zoom, max_zoom (int): Range of pyramid levels to render.
+        tile_size (int): Tile side in pixels.
+        workers (int): Number of worker processes (default: one per CPU).
+        display (dict): Display toggles ("constellations", "labels", "show_hr") overriding the defaults.
+
+    Returns:
+        int: Number of tiles written.
+    """
+    columns, _, _ = load_catalog()
+    half = world_half_size(columns["x"], columns["y"])
+
+    blocks = list(pyramid_blocks(min_zoom, max_zoom))
+    total = pyramid_size(min_zoom, max_zoom)
+    workers = workers or os.cpu_count()
+    print(f"Exporting {total} tiles (levels {min_zoom}-{max_zoom}) with {workers} workers to {out_dir}/")
+
+    start = last_report = time.perf_counter()
+    done = 0
+    block_size = METATILE * tile_size
+    settings = {"display": display or {}, "half": half, "tile_size": tile_size, "out_dir": out_dir}
+    # Blocks of a level are whole pixels apart, so a segment drawn unclipped is rasterized
+    # the same in every block it crosses; only clip segments reaching well beyond the block
+    clip_margin = CLIP_TILES * tile_size
+    with worker_pool(workers, (block_size, block_size), settings, clip_margin) as pool:
+        for written in pool.imap_unordered(render_block, blocks, chunksize=CHUNK_SIZE):
+            done += written
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL or done == total:
+                print(f"  {done}/{total} tiles ({100 * done / total:.0f}%), {done / (now - start):.1f} tiles/s")
+                last_report = now
+
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {total} tiles in {elapsed:.1f} s ({total / elapsed:.1f} tiles/s)")
+    return total
+
+
+def main():
+    """
+    Command line entry point for the tile export.
+    """
+    parser = argparse.ArgumentParser(description="Export the sky map as a z/x/y PNG tile pyramid.")
+    parser.add_argument("--out", default=TILES_DIR, help="Output directory.")
+    parser.add_argument("--min-zoom", type=int, default=0, help="First pyramid level.")
+    parser.add_argument("--max-zoom", type=int, default=3, help="Last pyramid level.")
+    parser.add_argument("--tile-size", type=int, default=TILE_SIZE, help="Tile side in pixels.")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: one per CPU).")
+    parser.add_argument("--no-lines", action="store_true", help="Leave out the constellation lines.")
+    parser.add_argument("--no-names", action="store_true", help="Leave out the constellation names.")
+    parser.add_argument("--hr", action="store_true", help="Add the HR labels of the stars.")
+    args = parser.parse_args()
+
+    display = {
+        "constellations": not args.no_lines,
+        "labels": not args.no_names,
+        "show_hr": args.hr,
+    }
+    export_tiles(args.out, args.min_zoom, args.max_zoom, args.tile_size, args.workers, display)
+
+
+if __name__ == '__main__':
+    main()
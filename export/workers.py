@@ -0,0 +1,52 @@
+import os
+import multiprocessing
+
+# Render without a display; must be set before pygame is initialized (also in the workers)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from stars.catalog_cache import load_catalog
+from renderer.scene import Scene, load_fonts
+
+# Per-process state of a pool worker, set by init_worker
+WORKER = {}
+
+
+def init_worker(size, settings, clip_margin=None):
+    """
+    Load the scene once per worker process.
+
+    The catalog columns and unit vectors come from the on-disk cache, memory-mapped read-only
+    and already sorted by magnitude, so the StarField uses them without a copy and the workers
+    share the same pages instead of each parsing ybsc5. The rest is built by every worker: the
+    projected and transformed coordinates (written as views change), the sky index tables and
+    the level of detail tiers of the zooms it renders.
+
+    Parameters:
+        size (tuple): (width, height) of the scene and of the surface it is drawn on.
+        settings (dict): Values of the export kept in WORKER for the tasks (e.g. the output directory).
+        clip_margin (int): Optional clip margin of the constellation lines (see Scene).
+    """
+    pygame.font.init()
+    WORKER["scene"] = Scene(size, load_fonts())
+    if clip_margin is not None:
+        WORKER["scene"].clip_margin = clip_margin
+    WORKER["surface"] = pygame.Surface(size)
+    WORKER.update(settings)
+
+
+def worker_pool(workers, size, settings, clip_margin=None):
+    """
+    Start a pool of render processes, each with a scene of its own (see init_worker).
+
+    The catalog is parsed and cached once, before the workers map it.
+
+    Parameters:
+        workers (int): Number of worker processes.
+        size, settings, clip_margin: See init_worker.
+
+    Returns:
+        multiprocessing.Pool: The pool, to be used as a context manager.
+    """
+    load_catalog()
+    return multiprocessing.Pool(workers, initializer=init_worker, initargs=(size, settings, clip_margin))
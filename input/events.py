@@ -13,7 +13,8 @@ def handle_events(state, dt, events):
             - reflect_x, reflect_y (bool): axis reflection flags
             - shx, shy (float): shear values
             - overlay (bool): help overlay toggle
-            - constellations, labels, show_hr (bool): display toggles
+            - constellations, labels, show_hr, faint_glow (bool): display toggles
+            - pan_ra, pan_dec (float): projection center offset in degrees
         dt (float): Time delta since last frame (in seconds)
         events (list): List of Pygame events from pygame.event.get()
 
@@ -39,7 +40,9 @@ def handle_events(state, dt, events):
                     "scale": 0.4,
                     "reflect": False,
                     "shx": 0.0,
-                    "shy": 0.0
+                    "shy": 0.0,
+                    "pan_ra": 0.0,
+                    "pan_dec": 0.0
                 })
             # Help overlay
             elif event.key == pygame.K_h:
@@ -53,19 +56,38 @@ def handle_events(state, dt, events):
             # Stars HR labels on/off
             elif event.key == pygame.K_k:
                 state["show_hr"] = not state["show_hr"]
+            # Glow of the stars too faint to draw on/off
+            elif event.key == pygame.K_b:
+                state["faint_glow"] = not state["faint_glow"]
 
     # Continuos key state (held keys)
     keys = pygame.key.get_pressed()
+    # With shift held, the arrow keys move the projection center instead of rotating
+    shift = pygame.key.get_mods() & pygame.KMOD_SHIFT
 
     # Rotation (degrees per second)
     ROT_SPEED = 50
     # Reverse rotation direction if reflected
     rotation_sign = -1 if state.get("reflect_x") ^ state.get("reflect_y") else 1
-    if keys[pygame.K_q] or keys[pygame.K_LEFT]:
+    if keys[pygame.K_q] or (keys[pygame.K_LEFT] and not shift):
         state["angle"] -= ROT_SPEED * dt * rotation_sign
-    if keys[pygame.K_e] or keys[pygame.K_RIGHT]:
+    if keys[pygame.K_e] or (keys[pygame.K_RIGHT] and not shift):
         state["angle"] += ROT_SPEED * dt * rotation_sign
 
+    # Projection center (degrees per second at zoom 1, slower when zoomed in)
+    CENTER_SPEED = 12
+    if shift:
+        center_step = CENTER_SPEED * dt / state["scale"]
+        # RA grows to the left of the map and Dec upwards
+        if keys[pygame.K_LEFT]:
+            state["pan_ra"] += center_step
+        if keys[pygame.K_RIGHT]:
+            state["pan_ra"] -= center_step
+        if keys[pygame.K_UP]:
+            state["pan_dec"] += center_step
+        if keys[pygame.K_DOWN]:
+            state["pan_dec"] -= center_step
+
     # Zoom (scale factor per second)
     ZOOM_SPEED = 1.005
     if keys[pygame.K_PLUS] or keys[pygame.K_EQUALS]:
@@ -1,16 +1,40 @@
+import argparse
 import pygame
-from stars.stars import load_stars
-from constellations.constellations import load_constellations
-from renderer.draw import draw_stars, draw_constellations, draw_labels, draw_hr_labels
-from scr.transformations import compose_transformations
-from input.events import handle_events, build_operations
+from renderer.scene import Scene, SCALE, STAR_RENDERERS, load_fonts, initial_state
+from renderer.producer import FrameProducer
+from input.events import handle_events
+from profiling import StageProfiler, NULL_PROFILER
+from renderer.picking import CLICK_TOLERANCE
 
 
 # Simulation constants
 FPS = 60
-SCALE = 1000
-DEFAULT_ZOOM = 0.4
 MOUSE_TRANSLATION_SPEED = 2.0 
+MOUSE_CENTER_SPEED = 0.05   # Degrees the projection center moves per pixel dragged, at zoom 1
+
+
+def parse_args():
+    """
+    Parse the command line options.
+    """
+    parser = argparse.ArgumentParser(description="Constellations Map")
+    parser.add_argument("--profile", action="store_true", help="Time every stage and show the timings in the help overlay.")
+    parser.add_argument("--trace", help="Profile and write the per-frame timings to this file on exit (.json or .csv).")
+    parser.add_argument("--renderer", choices=sorted(STAR_RENDERERS), default="sprites",
+                        help="How stars are drawn: a sprite blit per star, or numpy splatting into the pixels.")
+    parser.add_argument("--no-layers", action="store_true",
+                        help="Draw every frame from scratch, instead of reusing cached layers while panning.")
+    parser.add_argument("--single-thread", action="store_true",
+                        help="Transform and cull each frame before drawing it, instead of on a producer thread one frame ahead.")
+    return parser.parse_args()
+
+
+def apply_zoom(state, scroll_delta_y):
+    """
+    Zoom the state by the mouse wheel scroll since the last frame.
+    """
+    if scroll_delta_y != 0.0:
+        state["scale"] *= 1.0 + scroll_delta_y * 0.05
 
 
 def main():
@@ -18,43 +42,28 @@ def main():
     Entry point for the constellation visualizer.
     Initializes the window, loads data, and runs the main loop.
     """
+    args = parse_args()
+    profiler = StageProfiler(trace=bool(args.trace)) if args.profile or args.trace else NULL_PROFILER
+
     # INITIALIZE PYGAME
     pygame.init()
     pygame.display.set_caption("Constellations Map")
 
     # FONTS
-    font_title = pygame.font.SysFont(None, 20)
-    font_text = pygame.font.SysFont(None, 17)
-    font_const = pygame.font.SysFont(None, 17)
-    font_hr = pygame.font.SysFont(None, 14)
+    fonts = load_fonts()
 
     info = pygame.display.Info()
     WIDTH = info.current_w
     HEIGHT = info.current_h
-    CENTER = (WIDTH // 2, HEIGHT // 2)
     screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
     clock = pygame.time.Clock()
 
     # LOAD DATA
-    stars, RA0, Dec0 = load_stars()
-    star_lookup = {star.hr: star for star in stars}
-    constellations = load_constellations(star_lookup, RA0, Dec0)
+    scene = Scene((WIDTH, HEIGHT), fonts, profiler=profiler, star_renderer=args.renderer, layers=not args.no_layers)
+    producer = None if args.single_thread else FrameProducer(scene)
 
     # INITIAL STATE
-    state = {
-        "angle": 0.0,
-        "tx": 0.0,
-        "ty": 0.0,
-        "scale": DEFAULT_ZOOM,
-        "reflect_x": False,
-        "reflect_y": False,
-        "shx": 0.0,
-        "shy": 0.0,
-        "overlay": True,
-        "constellations": True,
-        "labels": True,
-        "show_hr": False
-    }
+    state = initial_state()
 
     dragging = False
     last_mouse_pos = (0, 0)
@@ -63,10 +72,19 @@ def main():
     rotating = False
     last_rotation_pos = 0
 
+    centering = False
+    last_center_pos = (0, 0)
+
+    # Picking: the star under the mouse, and the one selected by the last click
+    press_pos = None
+    click_pos = None
+    selected = None
+
     running = True
     while running:
         # TIME
         dt = clock.tick(FPS) / 1000.0
+        profiler.start()
 
         # INPUT
         events = pygame.event.get()
@@ -75,6 +93,13 @@ def main():
                 running = False
             elif event.type == pygame.MOUSEWHEEL:
                 scroll_delta_y += event.y
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                press_pos = event.pos
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and press_pos is not None:
+                # A press and release in place is a click (otherwise it was a drag)
+                if abs(event.pos[0] - press_pos[0]) + abs(event.pos[1] - press_pos[1]) <= CLICK_TOLERANCE:
+                    click_pos = event.pos
+                press_pos = None
 
         running = handle_events(state, dt, events)
 
@@ -114,84 +139,60 @@ def main():
         else:
             rotating = False
 
-        # TRANSFORM
-        operations = build_operations(state)
-        if scroll_delta_y != 0.0:
-            zoom_factor = 1.0 + scroll_delta_y * 0.05
-            state["scale"] *= zoom_factor
-            scroll_delta_y = 0.0
-        matrix = compose_transformations(operations)
+        # Drag middle mouse to move the projection center (the sky follows the mouse)
+        if mouse_buttons[1]:
+            if not centering:
+                centering = True
+                last_center_pos = mouse_pos
+            else:
+                dx = mouse_pos[0] - last_center_pos[0]
+                dy = mouse_pos[1] - last_center_pos[1]
 
-        for star in stars:
-            star.apply_transformation(matrix)
+                dx_sign = -1 if state.get("reflect_y", False) else 1
+                dy_sign = -1 if state.get("reflect_x", False) else 1
+
+                state["pan_ra"] += dx * dx_sign * MOUSE_CENTER_SPEED / state["scale"]
+                state["pan_dec"] += dy * dy_sign * MOUSE_CENTER_SPEED / state["scale"]
+
+                last_center_pos = mouse_pos
+        else:
+            centering = False
+
+        profiler.lap("input")
+
+        # TRANSFORM AND CULLING (skipped or reduced to an offset when the view did not change)
+        if producer is None:
+            matrix = scene.update(state)
+            apply_zoom(state, scroll_delta_y)
+            frame = scene.prepare(state, matrix)
+        else:
+            # The producer prepares this state while the frame of the previous one is drawn
+            scene.clamp_pan(state)
+            view = dict(state)
+            apply_zoom(state, scroll_delta_y)
+            frame = producer.exchange(view, state)
+            profiler.lap("wait")
+        scroll_delta_y = 0.0
+
+        # PICKING (a click selects the star under the mouse, or clears the selection)
+        if click_pos is not None:
+            selected = scene.pick(frame, click_pos)
+            click_pos = None
+        hovered = None if dragging or rotating or centering else scene.pick(frame, mouse_pos)
+        profiler.lap("picking")
 
         # DRAW
-        screen.fill((0, 0, 0))
-
-        draw_stars(screen, stars, CENTER, SCALE * state["scale"], zoom_level=state["scale"])
-        if state["show_hr"]:
-            draw_hr_labels(screen, stars, CENTER, SCALE * state["scale"], state["scale"], font_hr)
-        if state["labels"]:
-            draw_labels(screen, constellations, CENTER, SCALE * state["scale"], font_const)
-        if state["constellations"]:
-            draw_constellations(screen, constellations, CENTER, SCALE * state["scale"])
-
-        # OVERLAY
-        if state["overlay"]:
-            overlay_surf = pygame.Surface((150, 480), pygame.SRCALPHA)
-            overlay_surf.fill((0, 0, 0, 180))
-
-            lines = [
-                "Constellations Map",
-                "----------------------------------",
-                "Controls:",
-                "[H] Toggle Help",
-                "[.] Show Constellations",
-                "[L] Show Names",
-                "[K] Show Stars HRs",
-                "[R] Reset",
-                "[+/-] Zoom",
-                "[Q/E] Rotate",
-                "[WASD] Move",
-                "[Z/X] Shear X",
-                "[C/V] Shear Y",
-                "[F] Reflect X",
-                "[G] Reflect Y",
-                "----------------------------------",
-                "Values:",
-                f"Constellations: {"On" if state["constellations"] else "Off"}",
-                f"Names: {"On" if state["labels"] else "Off"}",
-                f"Stars HRs: {"On" if state["show_hr"] else "Off"}",
-                f"Zoom: {state["scale"] / DEFAULT_ZOOM:.2f}x",
-                f"Angle: {state["angle"]:.1f}",
-                f"TX: {state["tx"]:.2f}   TY: {state["ty"]:.2f}",
-                f"SHX: {state["shx"]:.2f}  SHY: {state["shy"]:.2f}",
-                f"Reflect X: {"Yes" if state["reflect_x"] else "No"}",
-                f"Reflect Y: {"Yes" if state["reflect_y"] else "No"}",
-            ]
-
-            for i, text in enumerate(lines):
-                y = 15 + i * 18
-                if text == "Constellations Map":
-                    font = font_title
-                    color = (255, 255, 255)
-                elif text.strip().endswith(":"):
-                    font = font_text
-                    color = (255, 255, 255)
-                elif text.startswith("["):
-                    font = font_text
-                    color = (190, 190, 190)
-                else:
-                    font = font_text
-                    color = (190, 190, 190)
-                text_surf = font.render(text, True, color)
-                overlay_surf.blit(text_surf, (15, y))
-
-            screen.blit(overlay_surf, (0, 0))
+        scene.render(screen, frame, picked=hovered or selected)
 
         pygame.display.flip()
-
-    pygame.quit()    
+        profiler.lap("flip")
+        profiler.end_frame()
+
+    if producer is not None:
+        producer.close()
+    pygame.quit()
+    if args.trace:
+        profiler.export(args.trace)    
 
 
 if __name__ == '__main__':
@@ -0,0 +1,101 @@
+import argparse
+import random
+import time
+import numpy as np
+from scr.transformations import compose_transformations, CompiledTransform, OPERATION_PARAMS
+from input.events import build_operations
+from export.animation import frame_states
+
+TOLERANCE = 1e-12  # Largest difference allowed between a compiled and a reference matrix, relative to its size
+
+# Keyframes switching reflections and shear on and off, so the frames mix several structures
+KEYFRAMES = [
+    {"time": 0, "scale": 0.2},
+    {"time": 2, "scale": 1.5, "angle": 60, "tx": 0.5, "ty": -0.3, "reflect_x": True},
+    {"time": 4, "scale": 6.0, "angle": -30, "shx": 0.4, "reflect_y": True},
+    {"time": 6, "scale": 0.4, "angle": 0, "tx": 0, "ty": 0, "shx": 0, "reflect_x": False, "reflect_y": False},
+]
+
+
+def random_operations(rng, length):
+    """
+    A random list of transformations of any types, in any order.
+    """
+    operations = []
+    for _ in range(length):
+        t_type = rng.choice(sorted(OPERATION_PARAMS))
+        operation = {"type": t_type}
+        for param in OPERATION_PARAMS[t_type]:
+            operation[param] = rng.uniform(-360, 360) if t_type == "rotate" else rng.uniform(-3, 3)
+        if t_type == "reflect":
+            operation["axis"] = rng.choice(("x", "y", "both"))
+        operations.append(operation)
+    return operations
+
+
+def compose_each(lists):
+    """
+    Compose the lists one at a time with a fresh CompiledTransform, so each one is composed rather than looked up.
+    """
+    compiled = CompiledTransform(len(lists))
+    return np.array([compiled.compose(operations).copy() for operations in lists])
+
+
+def relative_error(result, expected):
+    """
+    Largest |difference| of each (K, 3, 3) pair of matrices, relative to the largest coefficient
+    of the expected matrix (or to 1, if smaller), over all K.
+    """
+    size = np.maximum(1.0, np.max(np.abs(expected), axis=(1, 2)))
+    return float(np.max(np.max(np.abs(result - expected), axis=(1, 2)) / size))
+
+
+def best_time(func, repeat):
+    """
+    Run func repeat times and return the best wall time (in seconds) and its last result.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """
+    Benchmark the compiled matrix composition against compose_transformations and check they agree,
+    one list at a time and in batches, on the frames of an animation and on random lists.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the composite matrix builders.")
+    parser.add_argument("--fps", type=float, default=60, help="Frame rate of the sample animation.")
+    parser.add_argument("--random", type=int, default=1000, help="Number of random transformation lists.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of timed runs per builder.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random lists.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = {
+        "animation": [build_operations(state) for state in frame_states(KEYFRAMES, args.fps)],
+        "random": [random_operations(rng, rng.randint(1, 8)) for _ in range(args.random)],
+    }
+
+    print(f"{'lists':<10} {'count':>6} {'numpy ms':>9} {'compiled ms':>12} {'batch ms':>9} {'max error':>11}")
+    worst = 0.0
+    for name, lists in cases.items():
+        reference, expected = best_time(lambda: np.array([compose_transformations(ops) for ops in lists]), args.repeat)
+        compiled, single = best_time(lambda: compose_each(lists), args.repeat)
+        batch, batched = best_time(lambda: CompiledTransform().compose_batch(lists), args.repeat)
+
+        difference = max(relative_error(single, expected), relative_error(batched, expected))
+        worst = max(worst, difference)
+        print(f"{name:<10} {len(lists):>6} {reference * 1000:9.2f} {compiled * 1000:12.2f} "
+              f"{batch * 1000:9.2f} {difference:11.3e}")
+
+    if worst > TOLERANCE:
+        raise SystemExit(f"Compiled matrices differ from compose_transformations by {worst:.3e}")
+
+
+if __name__ == '__main__':
+    main()
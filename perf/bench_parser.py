@@ -0,0 +1,112 @@
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import numpy as np
+from stars.bsc_parser import read_bsc_file, read_bsc_columns, RA_FIELDS, DE_FIELDS, VMAG_FIELD
+from stars.stars_coords_2d import CATALOG_PATH
+
+
+def best_time(func, repeat):
+    """
+    Run func repeat times and return the best wall time (in seconds) and its last result.
+    Anything the parser prints is swallowed so it does not skew the timing.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def per_line_columns(filepath):
+    """
+    Current per-line path: one dictionary per star, converted to columns at the end.
+    """
+    stars = read_bsc_file(filepath)
+    return {
+        "hr": np.array([int(s["HR"]) for s in stars], dtype=np.int32),
+        "name": np.array([s["Name"] for s in stars], dtype="U10"),
+        "ra_deg": np.array([s["RA_deg"] for s in stars]),
+        "dec_deg": np.array([s["Dec_deg"] for s in stars]),
+        "vmag": np.array([float(s["Vmag"]) for s in stars]),
+    }
+
+
+# Field values the fast path of decode_numeric does not handle itself, as (field, text)
+EDGE_CASES = [
+    (VMAG_FIELD, " 1e0 "), (VMAG_FIELD, "  nan"), (VMAG_FIELD, "  inf"), (VMAG_FIELD, "-inf "),
+    (VMAG_FIELD, "\t4.5\t"), (VMAG_FIELD, " 1_0 "), (VMAG_FIELD, "+.5  "), (VMAG_FIELD, "-0.  "),
+    (RA_FIELDS[0], "+1"), (RA_FIELDS[0], "-1"), (RA_FIELDS[1], "\t\t"), (RA_FIELDS[1], "\x1f5"),
+    (RA_FIELDS[2], "\t1.5"), (RA_FIELDS[2], "1e1 "), (RA_FIELDS[2], "5.  "), (RA_FIELDS[2], "1.2."),
+    (RA_FIELDS[2], "nan "), (RA_FIELDS[2], "1 2 "), (RA_FIELDS[2], "\t \t "),
+    (DE_FIELDS[0], "1."), (DE_FIELDS[0], "e1"), (DE_FIELDS[1], " -"), (DE_FIELDS[2], "\t3"),
+    (DE_FIELDS[2], "3\t"), (DE_FIELDS[2], "1e"), (DE_FIELDS[2], "\t\t"),
+]
+
+
+def check_edge_cases(filepath):
+    """
+    Check both parsers agree, columns and error messages, on catalog lines whose numeric fields
+    hold text outside the usual catalog format (see EDGE_CASES). The lines are made by
+    patching the fields of the first star of the catalog.
+    """
+    with open(filepath, "r") as file:
+        template = next(line.rstrip("\n") for line in file if line.strip())
+    lines = [template, "\t\t"]
+    for (start, end), text in EDGE_CASES:
+        lines.append(template[:start] + text + template[end:])
+
+    with tempfile.NamedTemporaryFile("w", suffix=".dat", delete=False) as file:
+        file.write("\n".join(lines) + "\n")
+    try:
+        results = []
+        for parse in (per_line_columns, read_bsc_columns):
+            messages = io.StringIO()
+            with contextlib.redirect_stdout(messages):
+                results.append((parse(file.name), messages.getvalue()))
+    finally:
+        os.remove(file.name)
+
+    (expected, expected_messages), (columns, messages) = results
+    for name, values in expected.items():
+        if not np.array_equal(values, columns[name], equal_nan=values.dtype.kind == "f"):
+            raise SystemExit(f"Parsers disagree on column {name!r} for the edge cases")
+    if messages != expected_messages:
+        raise SystemExit("Parsers report different errors for the edge cases")
+    return len(columns["hr"]), len(lines)
+
+
+def main():
+    """
+    Benchmark the bulk BSC parser against the per-line parser and check both agree,
+    on the catalog and on edge cases.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the Bright Star Catalog parsers.")
+    parser.add_argument("--catalog", default=CATALOG_PATH, help="Path to the catalog file.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of timed runs per parser.")
+    args = parser.parse_args()
+
+    per_line, expected = best_time(lambda: per_line_columns(args.catalog), args.repeat)
+    bulk, columns = best_time(lambda: read_bsc_columns(args.catalog), args.repeat)
+
+    for name, values in expected.items():
+        if not np.array_equal(values, columns[name]):
+            raise SystemExit(f"Parsers disagree on column {name!r}")
+
+    parsed, cases = check_edge_cases(args.catalog)
+
+    print(f"Stars parsed:   {len(columns['hr'])}")
+    print(f"Edge cases:     {parsed} of {cases} lines parsed, parsers agree")
+    print(f"Per-line parser: {per_line * 1000:8.2f} ms")
+    print(f"Bulk parser:     {bulk * 1000:8.2f} ms")
+    print(f"Speedup:         {per_line / bulk:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
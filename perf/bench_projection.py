@@ -0,0 +1,87 @@
+import argparse
+import math
+import time
+import numpy as np
+from stars.bsc_parser import read_bsc_columns
+from stars.stars_coords_2d import (
+    CATALOG_PATH, STRETCH_R_MAX, STRETCH_FACTOR,
+    angular_distance_batch, convert_to_2d_batch, radial_stretch_batch,
+)
+
+
+def reference_project(ra_deg, dec_deg, RA0, Dec0):
+    """
+    Per-star projection with the math module, as the scalar path used to run it.
+    Returns (x, y, distance to center) lists.
+    """
+    ra0 = math.radians(RA0)
+    dec0 = math.radians(Dec0)
+    xs, ys, distances = [], [], []
+    for ra_d, dec_d in zip(ra_deg, dec_deg):
+        ra = math.radians(ra_d)
+        dec = math.radians(dec_d)
+        cos_c = math.sin(dec0)*math.sin(dec) + math.cos(dec0)*math.cos(dec)*math.cos(ra - ra0)
+        c = math.acos(min(1, max(-1, cos_c)))
+        distances.append(math.degrees(c))
+        if c == 0:
+            xs.append(0.0)
+            ys.append(0.0)
+            continue
+        k = 2 / (1 + cos_c)
+        x = k * math.cos(dec) * math.sin(ra - ra0)
+        y = k * (math.cos(dec0)*math.sin(dec) - math.sin(dec0)*math.cos(dec)*math.cos(ra - ra0))
+        r = math.sqrt(x**2 + y**2)
+        stretch = 1 + (1 - min(r / STRETCH_R_MAX, 1)) * STRETCH_FACTOR
+        xs.append(x * stretch)
+        ys.append(y * stretch)
+    return xs, ys, distances
+
+
+def batch_project(ra_deg, dec_deg, RA0, Dec0):
+    """
+    Whole-catalog projection, stretch and distance to center with the batch API.
+    """
+    x, y = radial_stretch_batch(*convert_to_2d_batch(ra_deg, dec_deg, RA0, Dec0))
+    return x, y, angular_distance_batch(ra_deg, dec_deg, RA0, Dec0)
+
+
+def best_time(func, repeat):
+    """
+    Run func repeat times and return the best wall time (in seconds) and its last result.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """
+    Benchmark the batch projection against the per-star path and report how closely they agree.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the stereographic projection.")
+    parser.add_argument("--catalog", default=CATALOG_PATH, help="Path to the catalog file.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of timed runs per path.")
+    args = parser.parse_args()
+
+    columns = read_bsc_columns(args.catalog)
+    ra, dec = columns["ra_deg"], columns["dec_deg"]
+    RA0, Dec0 = float(np.mean(ra)), float(np.mean(dec))
+    ra_list, dec_list = ra.tolist(), dec.tolist()
+
+    scalar, expected = best_time(lambda: reference_project(ra_list, dec_list, RA0, Dec0), args.repeat)
+    batch, result = best_time(lambda: batch_project(ra, dec, RA0, Dec0), args.repeat)
+
+    print(f"Stars projected: {len(ra)}")
+    for name, a, b in zip(("x", "y", "distance"), expected, result):
+        print(f"Max |difference| in {name:<8}: {np.max(np.abs(np.array(a) - b)):.3e}")
+    print(f"Per-star path: {scalar * 1000:8.2f} ms")
+    print(f"Batch path:    {batch * 1000:8.2f} ms")
+    print(f"Speedup:       {scalar / batch:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import time
+import numpy as np
+from stars.bsc_parser import read_bsc_columns
+from stars.stars_coords_2d import CATALOG_PATH, angular_distance_batch
+from stars.sky_index import SkyIndex
+
+
+def scan_cone(ra_deg, dec_deg, ra, dec, radius):
+    """
+    Stars within radius degrees of (ra, dec), measuring the distance to every star.
+    """
+    return np.flatnonzero(angular_distance_batch(ra_deg, dec_deg, ra, dec) <= radius)
+
+
+def scan_nearest(ra_deg, dec_deg, ra, dec, k):
+    """
+    The k stars nearest to (ra, dec), sorting the distances to every star.
+    """
+    return np.argsort(angular_distance_batch(ra_deg, dec_deg, ra, dec), kind="stable")[:k]
+
+
+def timed(func, queries):
+    """
+    Run func on every query and return the total wall time (in seconds) and the results.
+    """
+    start = time.perf_counter()
+    results = [func(*query) for query in queries]
+    return time.perf_counter() - start, results
+
+
+def index_bytes(index):
+    """
+    Memory used by the cell tables of an index (the unit vectors aside).
+    """
+    return index.order.nbytes + index.cells.nbytes + index.cell_start.nbytes
+
+
+def check_large(count, queries, seed=0):
+    """
+    Index count synthetic stars spread over the sphere, check that the cell tables stay linear in
+    the number of stars (at most three integers per star, however many cells the grid has),
+    and that cone searches still agree with a scan.
+    """
+    rng = np.random.default_rng(seed)
+    ra_deg = rng.uniform(0, 360, count)
+    dec_deg = np.degrees(np.arcsin(rng.uniform(-1, 1, count)))
+
+    start = time.perf_counter()
+    index = SkyIndex(ra_deg, dec_deg)
+    build = time.perf_counter() - start
+    size = index_bytes(index)
+    bounded = size <= 3 * 8 * (count + 1)
+
+    points = list(zip(rng.uniform(0, 360, queries), np.degrees(np.arcsin(rng.uniform(-1, 1, queries)))))
+    same = all(np.array_equal(scan_cone(ra_deg, dec_deg, ra, dec, 1), index.query_cone(ra, dec, 1)) for ra, dec in points)
+    print(f"Synthetic: {count} stars, {index.n ** 3} cells ({len(index.cells)} occupied), "
+          f"{size / 2 ** 20:.1f} MB of cell tables, built in {build:.2f} s; bounded {bounded}, same {same}")
+    return bounded and same
+
+
+def main():
+    """
+    Benchmark cone searches and k-nearest queries of the sky index against a full scan,
+    checking that both return the same stars.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the cone-search index.")
+    parser.add_argument("--catalog", default=CATALOG_PATH, help="Path to the catalog file.")
+    parser.add_argument("--queries", type=int, default=1000, help="Number of random points queried.")
+    parser.add_argument("--k", type=int, default=5, help="Stars returned by the nearest queries.")
+    parser.add_argument("--large", type=int, default=1000000, help="Synthetic stars for the memory check (0 to skip).")
+    args = parser.parse_args()
+
+    columns = read_bsc_columns(args.catalog)
+    ra_deg, dec_deg = columns["ra_deg"], columns["dec_deg"]
+
+    start = time.perf_counter()
+    index = SkyIndex(ra_deg, dec_deg)
+    build = time.perf_counter() - start
+
+    # Points spread evenly over the sphere
+    rng = np.random.default_rng(0)
+    points = list(zip(rng.uniform(0, 360, args.queries), np.degrees(np.arcsin(rng.uniform(-1, 1, args.queries)))))
+
+    print(f"Stars indexed: {len(index)} ({index}, built in {build * 1000:.2f} ms)")
+    print(f"{'query':<12}{'scan ms':>10}{'index ms':>10}{'speedup':>10}  same")
+    for radius in (1, 5, 20, 60):
+        scan, expected = timed(lambda ra, dec: scan_cone(ra_deg, dec_deg, ra, dec, radius), points)
+        fast, result = timed(lambda ra, dec: index.query_cone(ra, dec, radius), points)
+        same = all(np.array_equal(a, b) for a, b in zip(expected, result))
+        print(f"{f'cone {radius}':<12}{scan * 1000 / len(points):10.4f}{fast * 1000 / len(points):10.4f}"
+              f"{scan / fast:10.1f}  {same}")
+
+    scan, expected = timed(lambda ra, dec: scan_nearest(ra_deg, dec_deg, ra, dec, args.k), points)
+    fast, result = timed(lambda ra, dec: index.query_nearest(ra, dec, args.k)[0], points)
+    same = all(np.array_equal(a, b) for a, b in zip(expected, result))
+    print(f"{f'nearest {args.k}':<12}{scan * 1000 / len(points):10.4f}{fast * 1000 / len(points):10.4f}"
+          f"{scan / fast:10.1f}  {same}")
+
+    if args.large:
+        check_large(args.large, 20)
+
+
+if __name__ == '__main__':
+    main()
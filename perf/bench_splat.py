@@ -0,0 +1,93 @@
+import os
+import argparse
+import time
+import numpy as np
+
+# Render without a display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from stars.stars import StarField
+from renderer.draw import draw_stars, visibility_limit
+from renderer.splat import splat_stars
+from renderer.scene import SCALE, DEFAULT_ZOOM
+
+DEFAULT_SIZE = (1280, 800)
+DEFAULT_COUNTS = (10000, 100000, 300000)
+
+
+def synthetic_field(count, size, zoom, seed=0):
+    """
+    A StarField of count stars spread over the screen, all bright enough to be drawn at the zoom level.
+    """
+    rng = np.random.default_rng(seed)
+    scale = SCALE * zoom
+    half_w = size[0] / 2 / scale
+    half_h = size[1] / 2 / scale
+    limit = visibility_limit(zoom)
+    columns = {
+        "hr": np.arange(1, count + 1),
+        "name": np.full(count, ""),
+        "vmag": rng.uniform(-1.5, limit - 1, count),
+        "ra_deg": rng.uniform(0, 360, count),
+        "dec_deg": np.degrees(np.arcsin(rng.uniform(-1, 1, count))),
+        "x": rng.uniform(-half_w, half_w, count),
+        "y": rng.uniform(-half_h, half_h, count),
+    }
+    return StarField(columns)
+
+
+def best_time(func, repeat):
+    """
+    Run func repeat times and return the best wall time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """
+    Time the sprite and splatting star renderers on synthetic catalogs of growing size,
+    and report how many pixels of their frames differ.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the star renderers.")
+    parser.add_argument("--stars", type=int, nargs="+", default=list(DEFAULT_COUNTS), help="Catalog sizes to try.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed frames per renderer.")
+    args = parser.parse_args()
+
+    pygame.init()
+    size = DEFAULT_SIZE
+    center = (size[0] // 2, size[1] // 2)
+    surfaces = {"sprites": pygame.Surface(size), "splat": pygame.Surface(size)}
+    renderers = {"sprites": draw_stars, "splat": splat_stars}
+
+    print(f"{size[0]}x{size[1]}, best of {args.repeat} frames")
+    print(f"{'stars':>8} {'sprites ms':>11} {'splat ms':>9} {'speedup':>8} {'differ %':>9}")
+    for count in args.stars:
+        stars = synthetic_field(count, size, DEFAULT_ZOOM)
+        times = {}
+        for name, draw in renderers.items():
+            surface = surfaces[name]
+
+            def frame():
+                surface.fill((0, 0, 0))
+                draw(surface, stars, center, SCALE * DEFAULT_ZOOM, zoom_level=DEFAULT_ZOOM)
+
+            times[name] = best_time(frame, args.repeat)
+
+        # Overlapping stars add up in the splatted frame, so the frames are not identical
+        a = pygame.surfarray.pixels3d(surfaces["sprites"])
+        b = pygame.surfarray.pixels3d(surfaces["splat"])
+        differ = 100 * np.count_nonzero((a != b).any(axis=2)) / (size[0] * size[1])
+        del a, b
+        print(f"{count:>8} {times['sprites'] * 1000:11.2f} {times['splat'] * 1000:9.2f} "
+              f"{times['sprites'] / times['splat']:8.1f} {differ:9.1f}")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+import os
+import argparse
+import json
+import math
+import time
+import numpy as np
+
+# Render without a display; must be set before pygame opens a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from renderer.scene import Scene, DEFAULT_ZOOM, SCALE, STAR_RENDERERS, load_fonts, initial_state
+from renderer.producer import FrameProducer
+from profiling import StageProfiler, NULL_PROFILER
+
+DEFAULT_SIZE = (1280, 800)
+DEFAULT_FRAMES = 600
+WARMUP_FRAMES = 10
+PERCENTILES = (50, 95, 99)
+LAYER_CHECK_FRAMES = 60   # Frames compared by --check-layers
+
+
+def zoom_sweep(t):
+    """
+    Sweep the zoom from a tenth of the default up to fifty times it and back, on a log scale.
+    """
+    return {"scale": DEFAULT_ZOOM * 10 ** (-1 + 2.7 * math.sin(math.pi * t) ** 2)}
+
+
+def rotation(t):
+    """
+    One full turn at the default zoom, with a slow pan.
+    """
+    return {"angle": 360.0 * t, "tx": 0.5 * math.sin(2 * math.pi * t), "ty": 0.5 * math.cos(2 * math.pi * t)}
+
+
+def hr_labels(t):
+    """
+    Zoom sweep with HR labels on for the first half and off for the second.
+    """
+    state = zoom_sweep(t)
+    state["show_hr"] = t < 0.5
+    return state
+
+
+def sky_pan(t):
+    """
+    Move the projection center once around the sky in RA while swinging in Dec,
+    so the stars are reprojected on every frame.
+    """
+    return {"pan_ra": 360.0 * t, "pan_dec": 60.0 * math.sin(2 * math.pi * t)}
+
+
+def drag(t):
+    """
+    Translate the view around a circle at a fixed zoom, as when dragging the map, so only tx and ty change.
+    """
+    return {"scale": 1.5, "tx": 0.3 * math.sin(2 * math.pi * t), "ty": 0.3 * math.cos(2 * math.pi * t)}
+
+
+def mixed(t):
+    """
+    The other scripts one after another, with shear and reflections in between.
+    """
+    part = int(t * 4)
+    local = t * 4 - part
+    if part == 0:
+        return zoom_sweep(local)
+    if part == 1:
+        return rotation(local)
+    if part == 2:
+        return {"scale": 1.5, "shx": 0.5 * math.sin(2 * math.pi * local), "reflect_x": local > 0.5}
+    return hr_labels(local)
+
+
+SCRIPTS = {
+    "zoom": zoom_sweep,
+    "rotate": rotation,
+    "hr": hr_labels,
+    "pan": sky_pan,
+    "drag": drag,
+    "mixed": mixed,
+}
+
+
+def frame_states(script, frames):
+    """
+    Yield the view state of each frame of a script.
+
+    Parameters:
+        script (callable): Maps the progress t in [0, 1) to the state values it sets.
+        frames (int): Number of frames.
+    """
+    for i in range(frames):
+        state = initial_state()
+        state.update(script(i / frames))
+        yield state
+
+
+def run(scene, screen, script, frames, warmup=WARMUP_FRAMES, producer=None):
+    """
+    Render a script and time every frame.
+
+    The warmup frames (a replay of the first state) fill the caches and are not timed.
+    If the scene has a profiler, each timed frame is also recorded stage by stage.
+    With a FrameProducer, each frame is prepared on its thread while the previous one is
+    rendered, as main does (the frames then lag the script by one).
+
+    Returns:
+        numpy.ndarray: Frame times in seconds.
+    """
+    def draw(state):
+        if producer is None:
+            scene.draw(screen, state, scene.update(state))
+        else:
+            frame = producer.exchange(state)
+            scene.profiler.lap("wait")
+            scene.render(screen, frame)
+
+    first = next(frame_states(script, 1))
+    for _ in range(warmup):
+        draw(first)
+        pygame.display.flip()
+
+    profiler = scene.profiler
+    times = np.empty(frames)
+    for i, state in enumerate(frame_states(script, frames)):
+        start = time.perf_counter()
+        profiler.start()
+        draw(state)
+        pygame.display.flip()
+        profiler.lap("flip")
+        profiler.end_frame()
+        times[i] = time.perf_counter() - start
+    return times
+
+
+def stage_means(frames):
+    """
+    Mean time in milliseconds of each stage over traced profiler frames.
+    """
+    stages = {}
+    for frame in frames:
+        for stage in frame:
+            stages.setdefault(stage, 0.0)
+    # The whole frame last
+    stages["total"] = stages.pop("total")
+    return {stage: 1000 * sum(frame.get(stage, 0.0) for frame in frames) / len(frames) for stage in stages}
+
+
+def summarize(times):
+    """
+    Return frame-time statistics in milliseconds and the throughput in frames per second.
+    """
+    ms = times * 1000
+    summary = {f"p{p}": float(np.percentile(ms, p)) for p in PERCENTILES}
+    summary["mean"] = float(ms.mean())
+    summary["max"] = float(ms.max())
+    summary["fps"] = float(len(times) / times.sum())
+    return summary
+
+
+def check_layers(size, frames, renderer):
+    """
+    Replay the drag script with and without cached layers and compare the frames.
+
+    The translation of each frame is snapped to whole pixels (the drag only scales the view, so
+    the matrix translation is the zoom times tx and ty), so the offset the layers are blitted
+    at is exact and a frame drawn from them must be the very frame drawn directly.
+    Only the stars layer is shown, since the names and lines are drawn over black rather than
+    over the stars (see renderer.layers).
+
+    Returns:
+        list: Number of differing pixels of each frame.
+    """
+    results = []
+    for layers in (False, True):
+        scene = Scene(size, load_fonts(), star_renderer=renderer, layers=layers)
+        surface = pygame.Surface(size)
+        results.append([])
+        for state in frame_states(drag, frames):
+            pixel = 1 / (SCALE * state["scale"] ** 2)
+            state["tx"] = round(state["tx"] / pixel) * pixel
+            state["ty"] = round(state["ty"] / pixel) * pixel
+            state.update({"labels": False, "constellations": False, "faint_glow": True, "show_hr": True})
+            scene.draw(surface, state, scene.update(state))
+            results[-1].append(pygame.surfarray.array3d(surface))
+    return [int((a != b).any(axis=2).sum()) for a, b in zip(*results)]
+
+
+def parse_size(text):
+    """
+    Parse a WIDTHxHEIGHT resolution.
+    """
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    """
+    Replay scripted views without a display and report frame-time percentiles and throughput.
+    """
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark.")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="Number of timed frames per script.")
+    parser.add_argument("--size", type=parse_size, default=DEFAULT_SIZE, help="Resolution as WIDTHxHEIGHT.")
+    parser.add_argument("--script", choices=sorted(SCRIPTS) + ["all"], default="all", help="View script to replay.")
+    parser.add_argument("--warmup", type=int, default=WARMUP_FRAMES, help="Untimed frames before each script.")
+    parser.add_argument("--json", help="Also write the results to this JSON file (to compare builds).")
+    parser.add_argument("--profile", action="store_true", help="Also report the mean time of each frame stage.")
+    parser.add_argument("--renderer", choices=sorted(STAR_RENDERERS), default="sprites", help="Star renderer.")
+    parser.add_argument("--layers", action="store_true", help="Reuse cached layers on translation-only frames, as main does.")
+    parser.add_argument("--threaded", action="store_true", help="Prepare frames on a producer thread, as main does.")
+    parser.add_argument("--check-layers", action="store_true",
+                        help="Check that drag frames drawn from cached layers match frames drawn directly, then exit.")
+    args = parser.parse_args()
+
+    pygame.init()
+    if args.check_layers:
+        frames = min(args.frames, LAYER_CHECK_FRAMES)
+        differing = check_layers(args.size, frames, args.renderer)
+        pygame.quit()
+        print(f"{frames} drag frames, cached layers against direct drawing: "
+              f"{sum(count > 0 for count in differing)} differ, at most {max(differing)} pixels")
+        if any(differing):
+            raise SystemExit("Frames drawn from cached layers differ from frames drawn directly")
+        return
+
+    screen = pygame.display.set_mode(args.size)
+    profiler = StageProfiler() if args.profile else NULL_PROFILER
+    scene = Scene(args.size, load_fonts(), profiler=profiler, star_renderer=args.renderer, layers=args.layers)
+    producer = FrameProducer(scene) if args.threaded else None
+
+    names = sorted(SCRIPTS) if args.script == "all" else [args.script]
+    results = {}
+    mode = "threaded" if args.threaded else "single-threaded"
+    if args.layers:
+        mode += ", cached layers"
+    print(f"{args.size[0]}x{args.size[1]}, {args.frames} frames per script, {args.renderer} renderer, {mode}")
+    print(f"{'script':<8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'fps':>8}")
+    for name in names:
+        traced = len(profiler.frames) if args.profile else 0
+        summary = summarize(run(scene, screen, SCRIPTS[name], args.frames, args.warmup, producer))
+        if args.profile:
+            summary["stages"] = stage_means(profiler.frames[traced:])
+        results[name] = summary
+        print(f"{name:<8} {summary['p50']:8.2f} {summary['p95']:8.2f} {summary['p99']:8.2f} "
+              f"{summary['max']:8.2f} {summary['fps']:8.1f}")
+
+    if args.profile:
+        print()
+        print("Mean stage times (ms):")
+        print(f"{'stage':<12}" + "".join(f" {name:>8}" for name in names))
+        # Every stage any script records, in order of first appearance, with the whole frame last
+        stages = {}
+        for name in names:
+            stages.update(dict.fromkeys(results[name]["stages"]))
+        stages["total"] = stages.pop("total")
+        for stage in stages:
+            print(f"{stage:<12}" + "".join(f" {results[name]['stages'].get(stage, 0.0):8.2f}" for name in names))
+    if producer is not None:
+        producer.close()
+    pygame.quit()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"size": list(args.size), "frames": args.frames, "renderer": args.renderer,
+                       "threaded": args.threaded, "layers": args.layers, "results": results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+import csv
+import json
+import time
+from collections import deque
+import numpy as np
+
+ROLLING_WINDOW = 120   # Frames kept for the rolling statistics
+HUD_INTERVAL = 30      # Frames between refreshes of the HUD lines
+
+
+class StageProfiler():
+    """
+    Wall-clock timing of the stages of the load path and of each frame.
+
+    Stages are timed as laps: start() sets a mark, and every lap(stage) charges the time since
+    the previous mark to that stage and moves the mark. Code being timed only needs to call lap()
+    where a stage ends, with no nesting to keep track of:
+
+        profiler.start()
+        handle_input()
+        profiler.lap("input")
+        draw()
+        profiler.lap("draw")
+        profiler.end_frame()
+
+    Attributes:
+        load (dict): Seconds spent in each stage of the load path (see end_load).
+        stages (list): Frame stage names, in the order they were first seen.
+        rolling (dict): Per stage, the times of the last ROLLING_WINDOW frames.
+        totals (collections.deque): Total time of the same frames.
+        frames (list): Per-frame stage times of the whole run, if tracing.
+    """
+    enabled = True
+
+    def __init__(self, window=ROLLING_WINDOW, trace=True):
+        self.window = window
+        self.trace = trace
+        self.load = {}
+        self.stages = []
+        self.rolling = {}
+        self.totals = deque(maxlen=window)
+        self.frames = []
+        self.frame_count = 0
+        self.current = {}
+        self.mark = time.perf_counter()
+        self.hud = []
+
+    def start(self):
+        """
+        Begin timing a frame (or the load path).
+        """
+        self.current = {}
+        self.mark = time.perf_counter()
+
+    def lap(self, stage):
+        """
+        Charge the time since the previous mark to a stage.
+        """
+        now = time.perf_counter()
+        self.current[stage] = self.current.get(stage, 0.0) + now - self.mark
+        self.mark = now
+
+    def end_load(self):
+        """
+        Keep the laps since start() as the load path timings.
+        """
+        self.load.update(self.current)
+        self.current = {}
+
+    def end_frame(self):
+        """
+        Add the laps since start() to the rolling statistics (and the trace) as one frame.
+        Stages that did not run in this frame (e.g. disabled labels) count as zero.
+        """
+        for stage in self.current:
+            if stage not in self.rolling:
+                self.stages.append(stage)
+                self.rolling[stage] = deque([0.0] * len(self.totals), maxlen=self.window)
+        for stage in self.stages:
+            self.rolling[stage].append(self.current.get(stage, 0.0))
+        total = sum(self.current.values())
+        self.totals.append(total)
+
+        if self.trace:
+            self.current["total"] = total
+            self.frames.append(self.current)
+        self.current = {}
+        self.frame_count += 1
+
+    def stats(self):
+        """
+        Rolling statistics of each frame stage, in milliseconds.
+
+        Returns:
+            dict: Stage name -> {"mean", "p95", "max"}, with "total" (the whole frame) last.
+        """
+        stats = {}
+        if not self.totals:
+            return stats
+        for stage in self.stages + ["total"]:
+            ms = np.array(self.totals if stage == "total" else self.rolling[stage]) * 1000
+            stats[stage] = {"mean": float(ms.mean()), "p95": float(np.percentile(ms, 95)), "max": float(ms.max())}
+        return stats
+
+    def hud_lines(self):
+        """
+        Text lines with the mean time of each stage, for the overlay panel.
+        They are refreshed every HUD_INTERVAL frames, so the panel is not redrawn every frame.
+        """
+        if self.frame_count % HUD_INTERVAL == 0 or not self.hud:
+            self.hud = ["----------------------------------", "Profile (ms):"]
+            self.hud += [f"{stage}: {s['mean']:.2f}" for stage, s in self.stats().items()]
+        return self.hud
+
+    def export_json(self, path):
+        """
+        Write the load timings, rolling statistics and per-frame trace (in milliseconds) to a JSON file.
+        """
+        data = {
+            "load": {stage: seconds * 1000 for stage, seconds in self.load.items()},
+            "stats": self.stats(),
+            "frames": [{stage: seconds * 1000 for stage, seconds in frame.items()} for frame in self.frames],
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def export_csv(self, path):
+        """
+        Write the per-frame trace to a CSV file, one row per frame and one column per stage (in milliseconds).
+        """
+        columns = self.stages + ["total"]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + columns)
+            for i, frame in enumerate(self.frames):
+                writer.writerow([i] + [f"{frame.get(stage, 0.0) * 1000:.4f}" for stage in columns])
+
+    def export(self, path):
+        """
+        Write the trace as CSV if the path ends in .csv, JSON otherwise.
+        """
+        if path.lower().endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+
+
+class NullProfiler():
+    """
+    Profiler that does nothing, used when profiling is off. Its hooks are empty methods,
+    so instrumented code costs one no-op call per stage and keeps no data.
+    """
+    enabled = False
+
+    def start(self):
+        pass
+
+    def lap(self, stage):
+        pass
+
+    def end_load(self):
+        pass
+
+    def end_frame(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,60 @@
+import numpy as np
+
+CLIP_MARGIN = 2  # Pixels around the surface kept when clipping, so clipped ends do not show at the border
+
+
+def clip_rect(surface, margin=CLIP_MARGIN):
+    """
+    Return the (xmin, xmax, ymin, ymax) clipping rectangle of a surface, grown by a margin.
+    """
+    width, height = surface.get_size()
+    return -margin, width - 1 + margin, -margin, height - 1 + margin
+
+
+def inside_rect(px, py, rect):
+    """
+    Boolean mask of the points that lie inside a (xmin, xmax, ymin, ymax) rectangle.
+    """
+    xmin, xmax, ymin, ymax = rect
+    return (px >= xmin) & (px <= xmax) & (py >= ymin) & (py <= ymax)
+
+
+def clip_segments(x1, y1, x2, y2, rect):
+    """
+    Clip line segments against a rectangle (Liang-Barsky), all segments at once.
+
+    Each segment is written as P(t) = P1 + t * (P2 - P1) for t in [0, 1]. Every rectangle
+    edge either raises the entry parameter t0 or lowers the exit parameter t1; a segment
+    is visible when t0 <= t1 at the end, and its visible part runs from P(t0) to P(t1).
+
+    Parameters:
+        x1, y1, x2, y2 (numpy.ndarray): Segment endpoints in pixels.
+        rect (tuple): Clipping rectangle (xmin, xmax, ymin, ymax).
+
+    Returns:
+        tuple: (visible, cx1, cy1, cx2, cy2), the mask of segments that cross the rectangle
+            and the clipped endpoints of those segments.
+    """
+    xmin, xmax, ymin, ymax = rect
+    dx = x2 - x1
+    dy = y2 - y1
+
+    t0 = np.zeros(len(x1))
+    t1 = np.ones(len(x1))
+    visible = np.ones(len(x1), dtype=bool)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+            # Parallel to this edge and outside of it
+            visible &= ~((p == 0) & (q < 0))
+            r = q / p
+            entering = p < 0
+            leaving = p > 0
+            t0 = np.where(entering, np.maximum(t0, r), t0)
+            t1 = np.where(leaving, np.minimum(t1, r), t1)
+
+    visible &= t0 <= t1
+    t0 = t0[visible]
+    t1 = t1[visible]
+    x1, y1, dx, dy = x1[visible], y1[visible], dx[visible], dy[visible]
+    return visible, x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy
@@ -0,0 +1,176 @@
+import numpy as np
+
+CULL_MARGIN = 64  # Extra pixels around the screen, so stars and labels at the edges are not cut off
+
+
+def viewport_bounds(matrix, center, scale, size, margin=CULL_MARGIN):
+    """
+    Map the screen rectangle back through the view transformation into base (untransformed) coordinates.
+
+    A pixel relates to transformed coordinates by px = cx - x * scale, py = cy - y * scale,
+    and transformed coordinates relate to base ones through the affine matrix. The screen
+    corners are inverted through both, and the bounding box of the resulting parallelogram is returned.
+
+    Parameters:
+        matrix (numpy.ndarray): Composite 3x3 transformation matrix.
+        center (tuple): Pixel coordinates (cx, cy) of the center of the screen.
+        scale (float): Factor to convert star coordinates into pixels.
+        size (tuple): Screen (width, height) in pixels.
+        margin (int): Extra pixels added around the screen.
+
+    Returns:
+        tuple: (xmin, xmax, ymin, ymax) in base coordinates, or None if the matrix is not invertible.
+    """
+    width, height = size
+    px = np.array([-margin, width + margin, -margin, width + margin], dtype=float)
+    py = np.array([-margin, -margin, height + margin, height + margin], dtype=float)
+
+    base = screen_to_base(matrix, center, scale, px, py)
+    if base is None:
+        return None
+    u, v = base
+    return float(u.min()), float(u.max()), float(v.min()), float(v.max())
+
+
+def screen_to_base(matrix, center, scale, px, py):
+    """
+    Map pixel positions back to base (untransformed) coordinates.
+
+    Parameters:
+        matrix (numpy.ndarray): Composite 3x3 transformation matrix.
+        center (tuple): Pixel coordinates (cx, cy) of the center of the screen.
+        scale (float): Factor to convert star coordinates into pixels.
+        px, py (numpy.ndarray or float): Pixel positions.
+
+    Returns:
+        tuple: (u, v) base coordinates, or None if the matrix is not invertible.
+    """
+    cx, cy = center
+
+    # Screen -> transformed coordinates
+    tx = (cx - np.asarray(px, dtype=float)) / scale
+    ty = (cy - np.asarray(py, dtype=float)) / scale
+
+    # Transformed -> base coordinates, inverting the affine matrix in closed form
+    a, b, c = matrix[0]
+    d, e, f = matrix[1]
+    det = a * e - b * d
+    if abs(det) < 1e-12:
+        return None
+    u = (e * (tx - c) - b * (ty - f)) / det
+    v = (a * (ty - f) - d * (tx - c)) / det
+    return u, v
+
+
+def visible_indices(grid, stars, matrix, center, scale, size, margin=CULL_MARGIN, count=None, coords=None):
+    """
+    Return the indices of the stars that land on screen, in catalog order.
+
+    Only the grid cells under the inverse-mapped viewport are looked at, so the cost follows
+    the number of stars on screen rather than the catalog size.
+
+    Parameters:
+        grid (UniformGrid): Index over the base coordinates of the stars.
+        stars (StarField): Stars with up-to-date transformed coordinates.
+        matrix, center, scale, size, margin: See viewport_bounds.
+        count (int): Optional number of leading stars to consider (e.g. the magnitude
+            visibility cutoff); fainter stars are dropped before any coordinate is read.
+        coords (numpy.ndarray): Optional (N, 3) transformed coordinates to read instead of
+            the stars' coords buffer (e.g. a transform stage's own buffer).
+
+    Returns:
+        numpy.ndarray: Sorted indices of the visible stars.
+    """
+    if count is None:
+        count = len(stars)
+    if coords is None:
+        coords = stars.coords
+
+    bounds = viewport_bounds(matrix, center, scale, size, margin)
+    if bounds is None:
+        candidates = np.arange(count)
+    else:
+        candidates = grid.query_rect(*bounds)
+        candidates = np.sort(candidates[candidates < count])
+
+    # Exact test on the transformed coordinates of the candidates
+    cx, cy = center
+    width, height = size
+    px = cx - coords[candidates, 0] * scale
+    py = cy - coords[candidates, 1] * scale
+    on_screen = (px >= -margin) & (px <= width + margin) & (py >= -margin) & (py <= height + margin)
+    return candidates[on_screen]
+
+
+def constellation_bounds(constellations):
+    """
+    Bounding box of each constellation in base coordinates.
+
+    Parameters:
+        constellations (list): Constellation instances with bound stars.
+
+    Returns:
+        numpy.ndarray: (C, 4) array of (xmin, xmax, ymin, ymax), NaN for constellations without stars.
+    """
+    bounds = np.full((len(constellations), 4), np.nan)
+    bound = [i for i, constellation in enumerate(constellations) if constellation.stars]
+    if not bound:
+        return bounds
+
+    # Stars of all the bound constellations one after another, reduced per constellation
+    field = constellations[bound[0]].stars[0].field
+    indices = np.array([star.index for i in bound for star in constellations[i].stars], dtype=np.int64)
+    lengths = np.array([len(constellations[i].stars) for i in bound], dtype=np.int64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    x = field.base[indices, 0]
+    y = field.base[indices, 1]
+    bounds[bound, 0] = np.minimum.reduceat(x, starts)
+    bounds[bound, 1] = np.maximum.reduceat(x, starts)
+    bounds[bound, 2] = np.minimum.reduceat(y, starts)
+    bounds[bound, 3] = np.maximum.reduceat(y, starts)
+    return bounds
+
+
+def visible_constellations(constellations, bounds, matrix, center, scale, size, margin=CULL_MARGIN):
+    """
+    Return the constellations whose bounding box intersects the inverse-mapped viewport.
+
+    Parameters:
+        constellations (list): Constellation instances.
+        bounds (numpy.ndarray): Their bounding boxes, from constellation_bounds.
+        matrix, center, scale, size, margin: See viewport_bounds.
+
+    Returns:
+        list: The constellations that may appear on screen.
+    """
+    view = viewport_bounds(matrix, center, scale, size, margin)
+    if view is None:
+        return constellations
+    overlaps = overlapping(bounds, view)
+    return [c for c, visible in zip(constellations, overlaps.tolist()) if visible]
+
+
+def visible_polylines(edges, matrix, center, scale, size, margin=CULL_MARGIN):
+    """
+    Return the polylines of compiled constellation edges whose bounding box intersects the inverse-mapped viewport.
+
+    Parameters:
+        edges (ConstellationEdges): Compiled constellation lines.
+        matrix, center, scale, size, margin: See viewport_bounds.
+
+    Returns:
+        numpy.ndarray: Indices of the polylines that may appear on screen.
+    """
+    view = viewport_bounds(matrix, center, scale, size, margin)
+    if view is None:
+        return np.arange(len(edges))
+    return np.flatnonzero(overlapping(edges.bounds, view))
+
+
+def overlapping(bounds, view):
+    """
+    Boolean mask of the bounding boxes (rows of xmin, xmax, ymin, ymax) that intersect a view rectangle.
+    NaN boxes never intersect.
+    """
+    xmin, xmax, ymin, ymax = view
+    return (bounds[:, 0] <= xmax) & (bounds[:, 1] >= xmin) & (bounds[:, 2] <= ymax) & (bounds[:, 3] >= ymin)
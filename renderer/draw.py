@@ -1,15 +1,82 @@
 import pygame
 import math
+import numpy as np
+from renderer.sprites import StarSpriteCache
+from renderer.text_cache import TextCache
+from renderer.clipping import CLIP_MARGIN, clip_rect, inside_rect, clip_segments
 
+DEFAULT_SCALE = 0.3  # Zoom level at which the visibility limit is magnitude 5
 
-def draw_stars(surface, stars, center, scale, zoom_level=1.0, color=(255, 255, 255), min_size=1, max_size=3.5, min_alpha=50, max_alpha=255):
+
+def visibility_limit(zoom_level):
+    """
+    Faintest magnitude visible at a given zoom level: more stars appear as you zoom in.
+    """
+    zoom_relative = zoom_level / DEFAULT_SCALE
+    return 5 + 7 * math.log10(zoom_relative + 1e-5)
+
+
+# Star sprites and rendered labels shared by every draw call
+STAR_SPRITES = StarSpriteCache()
+TEXT_CACHE = TextCache()
+
+
+def star_appearance(stars, zoom_level, min_size, max_size, min_alpha, max_alpha, indices=None, translation=(0, 0)):
+    """
+    Size and opacity of the stars visible at a zoom level, from their magnitude and distance to the center.
+    Shared by the star renderers (see draw_stars for the parameters).
+
+    The distance is measured before the translation of the view, from the projection center,
+    so panning moves the stars without changing how they look (see renderer.layers).
+
+    Returns:
+        tuple: (indices, size, alpha) of the visible stars, with size the disc radius in pixels.
+    """
+    # Magnitude range (over the whole catalog) to normalize brightness
+    min_v, max_v = stars.vmag_min, stars.vmag_max
+    dv = max_v - min_v if max_v > min_v else 1
+
+    # Determine which stars are visible based on zoom and magnitude.
+    # Stars are sorted by magnitude, so the visible ones are those before the cutoff.
+    limit = visibility_limit(zoom_level)
+    cutoff = stars.visibility_cutoff(limit)
+    indices = np.arange(cutoff) if indices is None else indices[indices < cutoff]
+
+    # Read positions straight from the transformed coordinate buffer
+    x = stars.x[indices]
+    y = stars.y[indices]
+    vmag = stars.vmag[indices]
+
+    fade_range = 1
+    fade_factor = np.clip((limit - vmag) / fade_range, 0.0, 1.0)
+
+    # Normalize brightness based on magnitude
+    norm = (max_v - vmag) / dv
+
+    # Simulate depth by reducing size/brightness for distant stars
+    distance = np.sqrt((x - translation[0])**2 + (y - translation[1])**2)
+    depth_factor = 1 / (1 + (distance * 0.15)**2)
+
+    size = ((min_size + norm * (max_size - min_size)) * depth_factor).astype(int)
+    size = np.maximum(size, 1)
+
+    alpha = ((min_alpha + norm * (max_alpha - min_alpha)) * depth_factor).astype(int)
+    alpha = np.maximum(alpha, 1)
+    alpha = (alpha * fade_factor).astype(int)
+
+    return indices, size, alpha
+
+
+def draw_stars(surface, stars, center, scale, zoom_level=1.0, color=(255, 255, 255), min_size=1, max_size=3.5, min_alpha=50, max_alpha=255, indices=None, sprites=None, translation=(0, 0)):
     """
     Render stars as filled circles with brightness and size based on their magnitude.
     Stars farther away or with low brightness are faded out.
 
+    Each star is a pre-rendered disc from a sprite cache, and all of them are blitted in one batch.
+
     Parameters:
         surface (pygame.Surface): Target surface where stars will be drawn.
-        stars (list): List of Star instances with x, y, and vmag attributes.
+        stars (StarField): Stars with transformed coordinates and vmag values.
         center (tuple): Pixel coordinates (cx, cy) of the center of the map.
         scale (float): Factor to convert star coordinates into pixels.
         zoom_level (float): Zoom factor to control visibility range and size.
@@ -18,87 +85,129 @@ def draw_stars(surface, stars, center, scale, zoom_level=1.0, color=(255, 255, 2
         max_size (float): Maximum pixel size (radius) for the brightest stars.
         min_alpha (int): Minimum alpha (transparency) value for faint stars.
         max_alpha (int): Maximum alpha value for bright stars.
+        indices (numpy.ndarray): Optional subset of stars to draw (e.g. the ones on screen).
+        sprites (StarSpriteCache): Sprite cache to draw from (a shared one by default).
+        translation (tuple): (tx, ty) translation of the view matrix, left out of the distance
+            that fades stars (see star_appearance).
     """
     # Center of the screen
     cx, cy = center
+    if sprites is None:
+        sprites = STAR_SPRITES
 
-    # Get magnitude range to normalize brightness
-    vmag_values = [star.vmag for star in stars]
-    if not vmag_values:
-        return
-    min_v, max_v = min(vmag_values), max(vmag_values)
-    dv = max_v - min_v if max_v > min_v else 1
+    indices, size, alpha = star_appearance(stars, zoom_level, min_size, max_size, min_alpha, max_alpha, indices, translation)
+    x = stars.x[indices]
+    y = stars.y[indices]
 
-    for star in stars:
-        # Determine whether star should be visible based on zoom and magnitude
-        DEFAULT_SCALE = 0.3
-        zoom_relative = zoom_level / DEFAULT_SCALE
-        visibility_limit = 5 + 7 * math.log10(zoom_relative + 1e-5)
+    # Convert to pixel coordinates (top-left corner of each sprite)
+    px = np.floor(cx - x * scale - size).astype(int)
+    py = np.floor(cy - y * scale - size).astype(int)
 
-        fade_range = 1
-        fade_factor = max(0.0, min(1.0, (visibility_limit - star.vmag) / fade_range))
-        if star.vmag > visibility_limit and fade_factor <= 0.001:
-            continue    
+    color = tuple(color)
+    surface.blits([
+        (sprites.get(s, a, color), (left, top))
+        for s, a, left, top in zip(size.tolist(), alpha.tolist(), px.tolist(), py.tolist())
+    ], doreturn=False)
 
-        # Normalize brightness based on magnitude
-        norm = (max_v - star.vmag) / dv
 
-        # Simulate depth by reducing size/brightness for distant stars
-        distance = math.sqrt(star.x**2 + star.y**2)
-        depth_factor = 1 / (1 + (distance * 0.15)**2)
+def draw_aggregates(surface, tier, matrix, center, scale, color=(170, 180, 255), size=2, min_alpha=8, max_alpha=60, sprites=None):
+    """
+    Draw the aggregate points of a level of detail tier as faint glows, standing for the stars
+    too faint to be drawn one by one in dense regions.
 
-        size = int((min_size + norm * (max_size - min_size)) * depth_factor)
-        size = max(size, 1)
+    A point as bright as a star at the tier's magnitude limit gets max_alpha; fainter points fade out.
 
-        alpha = int((min_alpha + norm * (max_alpha - min_alpha)) * depth_factor)
-        alpha = max(alpha, 1)
-        alpha = int(alpha * fade_factor)
+    Parameters:
+        surface (pygame.Surface): Target surface.
+        tier (LodTier): Tier whose aggregate points are drawn.
+        matrix (numpy.ndarray): Composite 3x3 transformation matrix of the view.
+        center (tuple): Pixel coordinates (cx, cy) of the center of the map.
+        scale (float): Factor to convert star coordinates into pixels.
+        color (tuple): RGB color of the glows.
+        size (int): Pixel radius of the glows.
+        min_alpha, max_alpha (int): Alpha range of the glows.
+        sprites (StarSpriteCache): Sprite cache to draw from (a shared one by default).
+    """
+    if not len(tier.aggregate_vmag):
+        return
+    if sprites is None:
+        sprites = STAR_SPRITES
+
+    # The few aggregate points are transformed every frame
+    coords = tier.aggregate_base @ matrix.T
+    cx, cy = center
+    px = np.floor(cx - coords[:, 0] * scale - size).astype(int)
+    py = np.floor(cy - coords[:, 1] * scale - size).astype(int)
+    width, height = surface.get_size()
+    on_screen = (px > -2 * size) & (px < width) & (py > -2 * size) & (py < height)
 
-        # Convert to pixel coordinates
-        px = cx - star.x * scale
-        py = cy - star.y * scale
+    brightness = np.minimum(1.0, 10 ** (-0.4 * (tier.aggregate_vmag[on_screen] - tier.limit)))
+    alpha = np.maximum(min_alpha, (max_alpha * brightness).astype(int))
 
-        # Create circle with per-star alpha value
-        surf = pygame.Surface((size*2, size*2), pygame.SRCALPHA)
-        draw_color = (color[0], color[1], color[2], alpha)
-        pygame.draw.circle(surf, draw_color, (size, size), size)
-        surface.blit(surf, (int(px - size), int(py - size)))
+    color = tuple(color)
+    surface.blits([
+        (sprites.get(size, a, color), (left, top))
+        for a, left, top in zip(alpha.tolist(), px[on_screen].tolist(), py[on_screen].tolist())
+    ], doreturn=False)
 
 
-def draw_constellations(surface, constellations, center, scale, color=(200, 200, 200), width=1):
+def draw_constellations(surface, edges, center, scale, color=(200, 200, 200), width=1, polylines=None,
+                        clip_margin=CLIP_MARGIN):
     """
-    Draw lines between stars that form each constellation.
+    Draw the lines that form the constellations, from their compiled edge buffers.
+
+    Each distinct segment is drawn once; the endpoints of all polylines are mapped
+    to pixels in one vectorized step. Polylines entirely on the surface are drawn with
+    a single call each; the segments of the others are clipped against the surface
+    (see renderer.clipping) and only their visible parts are drawn.
 
     Parameters:
         surface (pygame.Surface): Surface where the lines will be drawn.
-        constellations (list): List of Constellation instances with .stars attribute.
+        edges (ConstellationEdges): Compiled constellation lines (see constellations.edges).
         center (tuple): Pixel coordinates (cx, cy) of the center of the screen.
         scale (float): Factor to convert star coordinates to pixels.
         color (tuple): RGB color for the constellation lines.
         width (int): Pixel thickness of the lines.
+        polylines (numpy.ndarray): Optional indices of the polylines to draw (e.g. from culling); all by default.
+        clip_margin (int): Pixels around the surface within which segments are left unclipped.
     """
-    # Center of the screen
+    if not len(edges):
+        return
+    stars = edges.stars
+    shown = np.zeros(len(edges), dtype=bool)
+    shown[np.arange(len(edges)) if polylines is None else polylines] = True
+
+    # Convert every vertex to screen pixels at once
     cx, cy = center
-    for constellation in constellations:
-        stars = constellation.stars
-        if len(stars) < 2:
-            continue
+    vertices = edges.vertices
+    px = cx - stars.x[vertices] * scale
+    py = cy - stars.y[vertices] * scale
+    rect = clip_rect(surface, clip_margin + width)
 
-        # Connect each star to the next in sequence
-        for a, b in zip(stars, stars[1:]):
-            # Convert endpoints to screen pixels
-            x1 = cx - a.x * scale
-            y1 = cy - a.y * scale
-            x2 = cx - b.x * scale
-            y2 = cy - b.y * scale
-            # Draw a line between the two points
-            pygame.draw.line(surface, color, (int(x1), int(y1)), (int(x2), int(y2)), width)
+    # Polylines with every vertex on the surface are drawn whole
+    inside = np.logical_and.reduceat(inside_rect(px, py, rect), edges.offsets[:-1])
+    offsets = edges.offsets.tolist()
+    for p in np.flatnonzero(shown & inside).tolist():
+        start, end = offsets[p], offsets[p + 1]
+        points = list(zip(np.floor(px[start:end]).astype(int).tolist(), np.floor(py[start:end]).astype(int).tolist()))
+        pygame.draw.lines(surface, color, False, points, width)
 
+    # The segments of the other polylines are clipped, and the invisible ones dropped
+    k = edges.segment_starts[(shown & ~inside)[edges.segment_polyline]]
+    _, x1, y1, x2, y2 = clip_segments(px[k], py[k], px[k + 1], py[k + 1], rect)
+    x1, y1, x2, y2 = (np.floor(v).astype(int).tolist() for v in (x1, y1, x2, y2))
+    segments = zip(x1, y1, x2, y2)
+    for ax, ay, bx, by in segments:
+        pygame.draw.line(surface, color, (ax, ay), (bx, by), width)
 
-def draw_labels(surface, constellations, center, scale, font, color=(255,255,0)):
+
+def draw_labels(surface, constellations, center, scale, font, color=(255,255,0), text_cache=None):
     """
     Draw the name of each constellation at the centroid of its stars.
+    Names are rendered once and reused from the text cache.
     """
+    if text_cache is None:
+        text_cache = TEXT_CACHE
     # Center of the screen
     cx, cy = center
     for constellation in constellations:
@@ -110,26 +219,66 @@ def draw_labels(surface, constellations, center, scale, font, color=(255,255,0))
         px = cx - avg_x * scale
         py = cy - avg_y * scale
 
-        name_surf = font.render(constellation.name, True, color)
+        name_surf = text_cache.render(font, constellation.name, color)
         w, h = name_surf.get_size()
-        surface.blit(name_surf, (int(px - w/2), int(py - h/2)))
+        surface.blit(name_surf, (math.floor(px - w/2), math.floor(py - h/2)))
 
 
-def draw_hr_labels(surface, stars, center, scale, zoom_level, font, color=(160, 160, 160)):
+def draw_hr_labels(surface, stars, center, scale, zoom_level, font, color=(160, 160, 160), indices=None, text_cache=None):
     """
     Show the HR (catalog) number of visible stars near their position.
+    Only the stars in indices are considered, if given.
+    Labels are rendered once and reused from the text cache, then blitted in one batch.
     """
+    if text_cache is None:
+        text_cache = TEXT_CACHE
+
     # Center of the screen    
     cx, cy = center
-    for star in stars:
-        DEFAULT_SCALE = 0.3
-        zoom_relative = zoom_level / DEFAULT_SCALE
-        visibility_limit = 5 + 7 * math.log10(zoom_relative + 1e-5)
-        if star.vmag > visibility_limit:
-            continue
 
-        px = cx - star.x * scale
-        py = cy - star.y * scale
-        label = str(star.hr)
-        label_surf = font.render(label, True, color)
-        surface.blit(label_surf, (int(px + 5), int(py - 5)))
\ No newline at end of file
+    # Only stars brighter than the visibility limit (a prefix of the magnitude-sorted field)
+    cutoff = stars.visibility_cutoff(visibility_limit(zoom_level))
+    indices = np.arange(cutoff) if indices is None else indices[indices < cutoff]
+
+    labels = []
+    for x, y, hr in zip(stars.x[indices].tolist(), stars.y[indices].tolist(), stars.hr[indices].tolist()):
+        px = cx - x * scale
+        py = cy - y * scale
+        label_surf = text_cache.render(font, str(hr), color)
+        labels.append((label_surf, (math.floor(px + 5), math.floor(py - 5))))
+    surface.blits(labels, doreturn=False)
+
+
+def draw_tooltip(surface, position, lines, font, color=(255, 255, 255), background=(0, 0, 0, 200),
+                 marker=6, padding=4, text_cache=None):
+    """
+    Mark a point with a ring and show a box of text lines next to it, e.g. the details of a picked star.
+    The box is placed below and to the right of the point, flipped to the other side where it would leave the surface.
+    """
+    if text_cache is None:
+        text_cache = TEXT_CACHE
+
+    px, py = math.floor(position[0]), math.floor(position[1])
+    pygame.draw.circle(surface, color, (px, py), marker, 1)
+
+    texts = [text_cache.render(font, line, color) for line in lines]
+    width = max(text.get_width() for text in texts) + 2 * padding
+    height = sum(text.get_height() for text in texts) + 2 * padding
+
+    x = px + marker + padding
+    y = py + marker + padding
+    if x + width > surface.get_width():
+        x = px - marker - padding - width
+    if y + height > surface.get_height():
+        y = py - marker - padding - height
+    # Keep the box on the surface even if the point is not
+    x = min(max(x, 0), surface.get_width() - width)
+    y = min(max(y, 0), surface.get_height() - height)
+
+    box = pygame.Surface((width, height), pygame.SRCALPHA)
+    box.fill(background)
+    ty = padding
+    for text in texts:
+        box.blit(text, (padding, ty))
+        ty += text.get_height()
+    surface.blit(box, (x, y))
@@ -0,0 +1,103 @@
+import pygame
+
+LAYER_MARGIN = 200   # Pixels cached around the viewport on each side, the pan a layer absorbs
+
+# Layers, bottom to top: stars (with the faint glow and HR labels), constellation names and lines
+LAYERS = ("stars", "names", "lines")
+
+
+class LayerCache():
+    """
+    Offscreen surfaces holding the layers of a scene, larger than the viewport by a margin on each side.
+
+    A star position on screen is the linear part of the view matrix applied to it, plus the
+    translation, and its size and opacity leave the translation out (see draw.star_appearance).
+    Layers drawn once can therefore be reused while only the translation changes
+    (panning with WASD or a left drag). The layers shown are flattened into one composite
+    surface, blitted at the pixel offset of the translation change since they were drawn.
+    The offset is rounded to whole pixels, so objects may land one pixel away from where they
+    would be drawn directly. The names and lines are drawn over black rather than over the
+    stars, so the antialiased edges of the names blend with black where they cross a star.
+
+    All the layers share one anchor, the translation they are drawn for. They are drawn again
+    when the pan leaves the margin. A layer whose own key (its display options) changed is
+    drawn again alone, at the anchor, and a layer turned off is left out of the composite but
+    kept. A change of the view itself (rotation, zoom, shear, reflection or projection center)
+    invalidates every layer. While the view keeps changing, caching would only draw bigger
+    surfaces, so such frames are drawn directly, and the layers are drawn again once the view
+    holds still.
+
+    Planning (see plan) and drawing are separate, so a frame can be planned on a producer
+    thread ahead of its rendering (see renderer.producer).
+
+    Attributes:
+        margin (int): Pixels cached around the viewport on each side.
+        size (tuple): (width, height) of the layer surfaces.
+        surfaces (dict): Surface of each layer by name; the stars layer is opaque, the others
+            are drawn on black, which is their transparent color key.
+        composite (pygame.Surface): The layers shown, flattened.
+        view (tuple): View of the previous planned frame.
+        anchor (tuple): Translation of the matrix the layers were drawn for, or None.
+        keys (dict): Key each layer was last planned to be drawn with, by name.
+        shown (list): Names of the layers in the composite.
+    """
+    def __init__(self, size, margin=LAYER_MARGIN):
+        self.margin = margin
+        self.size = (size[0] + 2 * margin, size[1] + 2 * margin)
+        self.surfaces = {name: pygame.Surface(self.size) for name in LAYERS}
+        # The sky is black, so the black pixels of the upper layers are left out of their blits
+        for name in LAYERS[1:]:
+            self.surfaces[name].set_colorkey((0, 0, 0))
+        self.composite = pygame.Surface(self.size)
+        self.view = None
+        self.anchor = None
+        self.keys = {}
+        self.shown = []
+
+    def center(self, center, offset=(0, 0)):
+        """
+        Pixel position on the layer surfaces of a projection center on screen,
+        for layers drawn at a pixel offset from the current view (see plan).
+        """
+        return (center[0] + self.margin - offset[0], center[1] + self.margin - offset[1])
+
+    def plan(self, view, layers, matrix, pixel_scale):
+        """
+        Decide which layers of a frame are drawn again, and where the composite is blitted.
+
+        Parameters:
+            view (tuple): Everything the layers depend on besides the translation and their own
+                options (e.g. the linear part of the matrix, the pixel scale and the projection center).
+            layers (dict): Key of each layer shown in the frame (its display options), by name, in LAYERS order.
+            matrix (numpy.ndarray): Composite matrix of the frame.
+            pixel_scale (float): Factor to convert star coordinates into pixels.
+
+        Returns:
+            dict: "shown" layer names, the ones to "redraw", whether to "compose" them again, and the
+                pixel "offset" (dx, dy) of the current view from the anchor. None if the view changed
+                since the previous frame, in which case the frame is drawn directly.
+        """
+        steady = view == self.view
+        self.view = view
+        if not steady:
+            self.anchor = None
+            self.keys.clear()
+            return None
+
+        translation = (float(matrix[0, 2]), float(matrix[1, 2]))
+        offset = (0, 0)
+        if self.anchor is not None:
+            # Screen pixels move opposite to the translation (see draw.draw_stars)
+            offset = (round((self.anchor[0] - translation[0]) * pixel_scale),
+                      round((self.anchor[1] - translation[1]) * pixel_scale))
+        if self.anchor is None or abs(offset[0]) > self.margin or abs(offset[1]) > self.margin:
+            self.anchor = translation
+            self.keys.clear()
+            offset = (0, 0)
+
+        shown = list(layers)
+        redraw = [name for name in shown if self.keys.get(name) != layers[name]]
+        self.keys.update(layers)
+        compose = bool(redraw) or shown != self.shown
+        self.shown = shown
+        return {"shown": shown, "redraw": redraw, "compose": compose, "offset": offset}
@@ -0,0 +1,114 @@
+import pygame
+from renderer.text_cache import TextCache
+
+OVERLAY_SIZE = (150, 480)
+OVERLAY_BACKGROUND = (0, 0, 0, 180)
+LINE_HEIGHT = 18
+MARGIN = 15
+
+CONTROLS = [
+    "Constellations Map",
+    "----------------------------------",
+    "Controls:",
+    "[H] Toggle Help",
+    "[.] Show Constellations",
+    "[L] Show Names",
+    "[K] Show Stars HRs",
+    "[B] Show Faint Glow",
+    "[R] Reset",
+    "[+/-] Zoom",
+    "[Q/E] Rotate",
+    "[WASD] Move",
+    "[Shift+Arrows] Pan",
+    "[Z/X] Shear X",
+    "[C/V] Shear Y",
+    "[F] Reflect X",
+    "[G] Reflect Y",
+    "----------------------------------",
+    "Values:",
+]
+
+
+def overlay_lines(state, default_zoom):
+    """
+    Build the text lines of the help overlay: the controls, then the current state values.
+
+    Parameters:
+        state (dict): Transformation state and display toggles.
+        default_zoom (float): Zoom level shown as 1.00x.
+
+    Returns:
+        list: Lines of text, top to bottom.
+    """
+    return CONTROLS + [
+        f"Constellations: {'On' if state['constellations'] else 'Off'}",
+        f"Names: {'On' if state['labels'] else 'Off'}",
+        f"Stars HRs: {'On' if state['show_hr'] else 'Off'}",
+        f"Faint Glow: {'On' if state['faint_glow'] else 'Off'}",
+        f"Zoom: {state['scale'] / default_zoom:.2f}x",
+        f"Angle: {state['angle']:.1f}",
+        f"TX: {state['tx']:.2f}   TY: {state['ty']:.2f}",
+        f"SHX: {state['shx']:.2f}  SHY: {state['shy']:.2f}",
+        f"Pan RA: {state['pan_ra']:+.1f}  Dec: {state['pan_dec']:+.1f}",
+        f"Reflect X: {'Yes' if state['reflect_x'] else 'No'}",
+        f"Reflect Y: {'Yes' if state['reflect_y'] else 'No'}",
+    ]
+
+
+class OverlayPanel():
+    """
+    The help overlay, kept as a pre-rendered surface.
+
+    The panel is only redrawn when one of its displayed lines changes (e.g. the zoom
+    value shown with two decimals); otherwise drawing it is a single blit.
+
+    Attributes:
+        rebuilds (int): Number of times the panel surface was redrawn.
+    """
+    def __init__(self, font_title, font_text, default_zoom, text_cache=None):
+        self.font_title = font_title
+        self.font_text = font_text
+        self.default_zoom = default_zoom
+        self.text_cache = text_cache if text_cache is not None else TextCache(max_entries=256)
+        self.surface = pygame.Surface(OVERLAY_SIZE, pygame.SRCALPHA)
+        self.lines = None
+        self.rebuilds = 0
+
+    def render(self, lines):
+        """
+        Redraw the panel surface with the given lines, growing it if they do not fit.
+        """
+        height = max(OVERLAY_SIZE[1], 2 * MARGIN + len(lines) * LINE_HEIGHT)
+        if height != self.surface.get_height():
+            self.surface = pygame.Surface((OVERLAY_SIZE[0], height), pygame.SRCALPHA)
+        self.surface.fill(OVERLAY_BACKGROUND)
+        for i, text in enumerate(lines):
+            y = MARGIN + i * LINE_HEIGHT
+            if text == "Constellations Map":
+                font = self.font_title
+                color = (255, 255, 255)
+            elif text.strip().endswith(":"):
+                font = self.font_text
+                color = (255, 255, 255)
+            else:
+                font = self.font_text
+                color = (190, 190, 190)
+            text_surf = self.text_cache.render(font, text, color)
+            self.surface.blit(text_surf, (MARGIN, y))
+        self.lines = lines
+        self.rebuilds += 1
+
+    def draw(self, surface, state, position=(0, 0), extra_lines=()):
+        """
+        Draw the overlay, redrawing the panel first if any displayed value changed.
+
+        Parameters:
+            surface (pygame.Surface): Target surface.
+            state (dict): Transformation state and display toggles.
+            position (tuple): Top-left corner of the panel.
+            extra_lines (list): Lines shown below the state values (e.g. profiler timings).
+        """
+        lines = overlay_lines(state, self.default_zoom) + list(extra_lines)
+        if lines != self.lines:
+            self.render(lines)
+        surface.blit(self.surface, position)
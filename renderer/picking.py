@@ -0,0 +1,67 @@
+import math
+import numpy as np
+from renderer.culling import screen_to_base
+
+PICK_RADIUS = 10         # Pixels around the mouse within which a star is picked
+CLICK_TOLERANCE = 4      # A press and release at most this many pixels apart is a click, not a drag
+
+
+def pick_star(grid, stars, matrix, center, scale, position, radius=PICK_RADIUS, count=None):
+    """
+    Return the star drawn nearest to a pixel position, if one is within a pixel radius.
+
+    The square of pixels around the position is mapped back through the view transformation
+    into base coordinates and looked up in the grid, so only the few stars under the mouse are
+    measured, whatever the catalog size. The candidates are then compared on screen.
+
+    Parameters:
+        grid (UniformGrid): Index over the base coordinates of the stars.
+        stars (StarField): Stars with up-to-date transformed coordinates.
+        matrix (numpy.ndarray): Composite 3x3 transformation matrix.
+        center (tuple): Pixel coordinates (cx, cy) of the projection center.
+        scale (float): Factor to convert star coordinates into pixels.
+        position (tuple): Pixel (x, y) position, e.g. of the mouse.
+        radius (float): Largest distance in pixels from the position to the star.
+        count (int): Optional number of leading stars to consider (e.g. the magnitude
+            visibility cutoff, so only stars that are drawn can be picked).
+
+    Returns:
+        int: Index of the nearest star in the StarField, or None.
+    """
+    if count is None:
+        count = len(stars)
+
+    x, y = position
+    px = np.array([x - radius, x + radius, x - radius, x + radius], dtype=float)
+    py = np.array([y - radius, y - radius, y + radius, y + radius], dtype=float)
+    base = screen_to_base(matrix, center, scale, px, py)
+    if base is None:
+        return None
+    u, v = base
+    candidates = grid.query_rect(u.min(), u.max(), v.min(), v.max())
+    # In catalog order, so the brighter star wins a tie
+    candidates = np.sort(candidates[candidates < count])
+    if not len(candidates):
+        return None
+
+    # Exact distance on screen, at the pixel the star is drawn at
+    cx, cy = center
+    dx = np.floor(cx - stars.x[candidates] * scale) - x
+    dy = np.floor(cy - stars.y[candidates] * scale) - y
+    distance = np.hypot(dx, dy)
+    nearest = int(np.argmin(distance))
+    if distance[nearest] > radius:
+        return None
+    return int(candidates[nearest])
+
+
+def star_info(star):
+    """
+    Text lines describing a star, for its tooltip.
+    """
+    vmag = "?" if math.isnan(star.vmag) else f"{star.vmag:.2f}"
+    return [
+        f"HR {star.hr}  {star.name.strip()}".rstrip(),
+        f"Vmag: {vmag}",
+        f"RA: {star.ra_deg:.3f}  Dec: {star.dec_deg:+.3f}",
+    ]
@@ -0,0 +1,124 @@
+import queue
+import threading
+from profiling import NULL_PROFILER
+
+
+class FrameProducer():
+    """
+    Prepares the next frame of a Scene on a worker thread while the current one is rendered.
+
+    The producer thread runs Scene.update and Scene.prepare (reprojection, transforms, level of
+    detail selection and culling, mostly numpy work that releases the GIL) for the state of
+    one loop iteration, while the main thread renders and flips the frame prepared for the
+    previous one. The picture therefore lags the input by one frame.
+
+    The transformed coordinates are double buffered. The transform stage keeps its own working
+    buffer up to date (so its hits and translation-only updates still apply), and the producer
+    copies the rows a frame reads into the back buffer. The main thread reads the front buffer
+    (it is the stars' coords buffer), and the two are swapped when a frame is handed over, at
+    a point where neither thread is using them.
+
+    The stages timed on the producer thread are not recorded (a profiler is used by one thread
+    only); the main thread times how long it waits for the producer instead.
+
+    Attributes:
+        scene (Scene): Scene whose frames are prepared.
+        work (numpy.ndarray): (N, 3) buffer kept up to date by the transform stage.
+        front (numpy.ndarray): Coordinates of the frame being rendered (the stars' coords buffer).
+        back (numpy.ndarray): Coordinates of the frame being prepared.
+    """
+    def __init__(self, scene):
+        self.scene = scene
+        stars = scene.stars
+        self.work = stars.coords.copy()
+        self.front = stars.coords
+        self.back = stars.coords.copy()
+
+        stage = scene.transform_stage
+        stage.coords = self.work
+        stage.profiler = NULL_PROFILER
+        stage.valid = 0
+        stage.invalidate()
+        scene.update_profiler = NULL_PROFILER
+
+        # One job and one frame in flight: the producer is never more than a frame ahead
+        self.jobs = queue.Queue(maxsize=1)
+        self.frames = queue.Queue(maxsize=1)
+        self.pending = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """
+        Producer thread: prepare a frame for each job, until it gets None.
+        """
+        scene = self.scene
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            update_state, draw_state = job
+            try:
+                matrix = scene.update(update_state)
+                frame = scene.prepare(draw_state, matrix)
+                # Publish the rows the frame reads: the drawable prefix and the pinned stars
+                pinned = scene.transform_stage.pinned_beyond(frame.cutoff)
+                self.back[:frame.cutoff] = self.work[:frame.cutoff]
+                self.back[pinned] = self.work[pinned]
+            except Exception as error:
+                frame = error
+            self.frames.put(frame)
+
+    def submit(self, update_state, draw_state=None):
+        """
+        Start preparing a frame. The states are copied, so the caller may go on changing them
+        (Scene.update clamps pan_dec in the copy, so the caller clamps its own with Scene.clamp_pan).
+
+        Parameters:
+            update_state (dict): State passed to Scene.update.
+            draw_state (dict): State passed to Scene.prepare, if different (see main, which
+                applies the scroll zoom in between).
+        """
+        draw_state = update_state if draw_state is None else draw_state
+        self.jobs.put((dict(update_state), dict(draw_state)))
+        self.pending = True
+
+    def collect(self):
+        """
+        Wait for the frame being prepared and make its coordinates the stars' coords buffer.
+        Must not be called while a frame is being rendered.
+
+        Returns:
+            Frame: The prepared frame.
+        """
+        frame = self.frames.get()
+        self.pending = False
+        if isinstance(frame, Exception):
+            raise frame
+        self.front, self.back = self.back, self.front
+        self.scene.stars.coords = self.front
+        return frame
+
+    def exchange(self, update_state, draw_state=None):
+        """
+        Hand over the frame prepared for the previous states and start preparing the next one.
+        The first call waits for a frame of its own states.
+
+        Returns:
+            Frame: The frame to render.
+        """
+        if not self.pending:
+            self.submit(update_state, draw_state)
+        frame = self.collect()
+        self.submit(update_state, draw_state)
+        return frame
+
+    def close(self):
+        """
+        Stop the producer thread, after the frame in flight.
+        """
+        if self.pending:
+            self.frames.get()
+            self.pending = False
+        self.jobs.put(None)
+        self.thread.join()
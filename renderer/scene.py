@@ -0,0 +1,404 @@
+import copy
+import pygame
+import numpy as np
+from stars.stars import load_stars
+from constellations.constellations import load_constellations, rebind_constellations
+from constellations.edges import compile_edges
+from renderer.draw import draw_stars, draw_aggregates, draw_constellations, draw_labels, draw_hr_labels, draw_tooltip, visibility_limit
+from scr.transform_stage import TransformStage
+from stars.lod import LodPyramid
+from stars.sky_index import SkyIndex
+from stars.stars_coords_2d import project_unit_vectors
+from renderer.overlay import OverlayPanel
+from renderer.layers import LAYERS, LayerCache
+from renderer.culling import visible_indices, constellation_bounds, visible_constellations, visible_polylines
+from renderer.picking import PICK_RADIUS, pick_star, star_info
+from renderer.splat import splat_stars
+from renderer.clipping import CLIP_MARGIN
+from profiling import NULL_PROFILER
+
+# Rendering constants
+SCALE = 1000        # Pixels per projected unit at zoom 1
+DEFAULT_ZOOM = 0.4
+
+# Star renderers, selectable by name: one sprite blit per star, or numpy splatting into the pixels
+STAR_RENDERERS = {
+    "sprites": draw_stars,
+    "splat": splat_stars,
+}
+
+
+def load_fonts():
+    """
+    Create the fonts used by the map (pygame.font must be initialized).
+
+    Returns:
+        dict: Fonts for the overlay "title" and "text", constellation names ("const") and HR labels ("hr").
+    """
+    return {
+        "title": pygame.font.SysFont(None, 20),
+        "text": pygame.font.SysFont(None, 17),
+        "const": pygame.font.SysFont(None, 17),
+        "hr": pygame.font.SysFont(None, 14),
+    }
+
+
+def initial_state():
+    """
+    Return the view and display state the map starts with.
+    """
+    return {
+        "angle": 0.0,
+        "tx": 0.0,
+        "ty": 0.0,
+        "scale": DEFAULT_ZOOM,
+        "reflect_x": False,
+        "reflect_y": False,
+        "shx": 0.0,
+        "shy": 0.0,
+        "overlay": True,
+        "constellations": True,
+        "labels": True,
+        "show_hr": False,
+        "faint_glow": False,
+        "pan_ra": 0.0,
+        "pan_dec": 0.0
+    }
+
+
+class Frame():
+    """
+    One prepared frame: the view and what is visible in it (see Scene.prepare).
+
+    The frame keeps its own references to everything render reads besides the star coordinates,
+    taken when it was prepared, so it stays consistent while the scene is updated for the next
+    frame (recentering rebinds constellations, compiles new edges and clears level of detail tiers).
+
+    Attributes:
+        state (dict): Copy of the view and display state.
+        matrix (numpy.ndarray): Copy of the composite matrix.
+        center (tuple): Pixel position of the projection center.
+        pixel_scale (float): Factor to convert star coordinates into pixels.
+        projection (tuple): (RA0, Dec0) projection center of the frame.
+        cutoff (int): Number of leading stars bright enough to be drawn (all up to date).
+        tier (LodTier): Copy of the level of detail tier at the frame's zoom.
+        on_screen (numpy.ndarray): Indices of the stars to draw.
+        constellations (list): Copies of the constellations to label, with their star lists.
+        edges (ConstellationEdges): Compiled constellation lines.
+        polylines (numpy.ndarray): Indices of the polylines to draw.
+        layers (dict): How the cached layers are drawn (see LayerCache.plan), or None to draw
+            the frame directly. When layers are drawn again, the stars, constellations and
+            polylines above are those visible on the layer surfaces.
+    """
+    def __init__(self, state, matrix, center, pixel_scale, projection, cutoff, tier, on_screen, constellations, edges, polylines, layers=None):
+        self.state = dict(state)
+        self.matrix = matrix.copy()
+        self.center = center
+        self.pixel_scale = pixel_scale
+        self.projection = projection
+        self.cutoff = cutoff
+        self.tier = copy.copy(tier)
+        self.on_screen = on_screen
+        self.constellations = [copy.copy(constellation) for constellation in constellations]
+        self.edges = edges
+        self.polylines = polylines
+        self.layers = layers
+
+
+class Scene():
+    """
+    Stars, constellations and the indexes built over them, loaded once and drawn frame after frame.
+
+    A frame is two steps: update(state) brings the star coordinates in line with the view
+    and returns the composite matrix, and draw(surface, state, matrix) culls and draws.
+    They are separate so the caller can change the state in between (main applies the
+    scroll zoom there). Drawing is itself prepare (culling, into a Frame) then render,
+    so the next frame can be prepared while one is rendered (see renderer.producer).
+
+    The projection is centered at the catalog center moved by the "pan_ra" and "pan_dec" state
+    values (in degrees). When they change, update reprojects the stars around the new center
+    and rebuilds what depends on the base coordinates (see recenter).
+
+    Attributes:
+        size (tuple): Surface (width, height) in pixels.
+        center (tuple): Pixel coordinates of the center of the surface.
+        stars (StarField): Stars sorted by magnitude.
+        sky_index (SkyIndex): Cone-search index over the stars' RA/Dec (unaffected by the projection center).
+        RA0, Dec0 (float): Current projection center in decimal degrees.
+        home (tuple): (RA0, Dec0) of the catalog center, the projection center with no pan.
+        constellations (list): Constellation instances bound to the stars.
+        edges (ConstellationEdges): Compiled constellation lines.
+        lod (LodPyramid): Level of detail tiers; only the tier needed at the current zoom is transformed and culled.
+        profiler (StageProfiler): Times the load path and the stages of each frame.
+        update_profiler (StageProfiler): Times the update and prepare stages; the same profiler,
+            unless they run on another thread (see renderer.producer).
+        clip_margin (int): Pixels around the surface within which constellation lines are not clipped.
+        draw_stars (callable): Star renderer, one of STAR_RENDERERS.
+        layers (LayerCache): Cached star, name and line layers reused while only the translation
+            changes, or None to draw every frame from scratch.
+    """
+    def __init__(self, size, fonts, use_cache=True, profiler=NULL_PROFILER, star_renderer="sprites", layers=False):
+        self.size = size
+        self.center = (size[0] // 2, size[1] // 2)
+        self.fonts = fonts
+        self.profiler = profiler
+        self.update_profiler = profiler
+        self.clip_margin = CLIP_MARGIN
+        self.draw_stars = STAR_RENDERERS[star_renderer]
+        self.layers = LayerCache(size) if layers else None
+
+        # LOAD DATA
+        profiler.start()
+        self.stars, self.RA0, self.Dec0 = load_stars(use_cache=use_cache, profiler=profiler)
+        self.home = (self.RA0, self.Dec0)
+        self.sky_index = SkyIndex(self.stars.ra_deg, self.stars.dec_deg, unit=self.stars.unit)
+        profiler.lap("sky index")
+        star_lookup = {star.hr: star for star in self.stars}
+        self.constellations = load_constellations(star_lookup, self.RA0, self.Dec0, self.sky_index)
+        profiler.lap("bind constellations")
+        self.edges = compile_edges(self.constellations, self.stars)
+        profiler.lap("compile edges")
+
+        # Stars in constellations are drawn at any zoom, so they are always transformed
+        self.transform_stage = TransformStage(self.stars, profiler, self.constellation_stars())
+
+        self.overlay = OverlayPanel(fonts["title"], fonts["text"], DEFAULT_ZOOM)
+
+        # SPATIAL INDEXES (over the base coordinates, one star grid per level of detail, built on first use)
+        self.lod = LodPyramid(self.stars)
+        self.const_bounds = constellation_bounds(self.constellations)
+        profiler.lap("spatial indexes")
+        profiler.end_load()
+
+    def constellation_stars(self):
+        """
+        Indices of the stars in the bound constellations.
+        """
+        return [star.index for constellation in self.constellations for star in constellation.stars]
+
+    def projection_center(self, state):
+        """
+        Return the (RA0, Dec0) projection center of a state: the catalog center moved by its pan
+        values, with RA wrapped to [0, 360) and Dec clamped to the poles.
+        """
+        RA0 = (self.home[0] + state["pan_ra"]) % 360.0
+        Dec0 = min(90.0, max(-90.0, self.home[1] + state["pan_dec"]))
+        return RA0, Dec0
+
+    def clamp_pan(self, state):
+        """
+        Keep the Dec offset of a state at the pole it stopped at, in place, so panning back responds at once.
+        """
+        if abs(self.home[1] + state["pan_dec"]) > 90.0:
+            state["pan_dec"] = self.projection_center(state)[1] - self.home[1]
+
+    def recenter(self, RA0, Dec0):
+        """
+        Center the projection at new coordinates.
+
+        The stars are reprojected from their unit vectors in one pass, the constellations are
+        bound again (stars too far from the center are left out), and everything built over
+        the base coordinates is refreshed: the edge and constellation bounds at once, the level
+        of detail indexes when their tier is next used. The edges are only compiled again if a
+        constellation was bound or unbound.
+
+        Parameters:
+            RA0, Dec0 (float): New projection center in decimal degrees.
+        """
+        self.RA0, self.Dec0 = RA0, Dec0
+        self.stars.reproject(RA0, Dec0)
+
+        if rebind_constellations(self.constellations, self.stars, self.sky_index, RA0, Dec0):
+            self.edges = compile_edges(self.constellations, self.stars)
+            self.transform_stage.pin(self.constellation_stars())
+        else:
+            self.edges.update_bounds()
+            self.transform_stage.invalidate()
+        self.const_bounds = constellation_bounds(self.constellations)
+        self.lod.reindex()
+        self.update_profiler.lap("recenter")
+
+    def update(self, state):
+        """
+        Bring the star coordinates up to date with the view state and return the composite matrix.
+        The stars are reprojected first if the projection center moved (pan_dec is clamped in
+        place, so the center stops at the poles). Only the stars of the
+        level of detail tier visible at the state's zoom are transformed.
+        """
+        self.clamp_pan(state)
+        center = self.projection_center(state)
+        if center != (self.RA0, self.Dec0):
+            self.recenter(*center)
+        tier = self.lod.tier_for(visibility_limit(state["scale"]))
+        return self.transform_stage.update(state, tier.count)
+
+    def prepare(self, state, matrix, center=None):
+        """
+        Cull a frame: work out what is visible with the state and matrix, and make sure
+        the coordinates of every star drawn are up to date.
+
+        Parameters:
+            state (dict): View and display state.
+            matrix (numpy.ndarray): Composite matrix returned by update.
+            center (tuple): Pixel position of the projection center, if not the middle
+                of the surface (e.g. for a tile of a larger map).
+
+        Returns:
+            Frame: What render draws.
+        """
+        stars = self.stars
+        center = self.center if center is None else center
+        pixel_scale = SCALE * state["scale"]
+        limit = visibility_limit(state["scale"])
+
+        # LAYERS (reused with an offset while only the translation changes)
+        plan = None
+        if self.layers is not None:
+            view = (tuple(matrix[:2, :2].ravel().tolist()), pixel_scale, self.RA0, self.Dec0, center)
+            shown = {"stars": (state["faint_glow"], state["show_hr"])}
+            if state["labels"]:
+                shown["names"] = ()
+            if state["constellations"]:
+                shown["lines"] = ()
+            plan = self.layers.plan(view, shown, matrix, pixel_scale)
+        if plan is None:
+            redraw = LAYERS
+            view_center, view_size = center, self.size
+        else:
+            # Layers drawn again cover their whole surface, beyond the viewport, at the anchor
+            redraw = plan["redraw"]
+            view_center, view_size = self.layers.center(center, plan["offset"]), self.layers.size
+
+        # CULLING (only bright enough stars that land where they are drawn)
+        cutoff = stars.visibility_cutoff(limit)
+        tier = self.lod.tier_for(limit)
+        # The zoom may have changed since update (see main), so more stars may be needed
+        self.transform_stage.cover(cutoff)
+        on_screen, shown_constellations, shown_polylines = None, [], None
+        if "stars" in redraw:
+            # Read from the transform stage's buffer, which is not the one being rendered (see renderer.producer)
+            on_screen = visible_indices(tier.grid, stars, matrix, view_center, pixel_scale, view_size, count=cutoff,
+                                        coords=self.transform_stage.coords)
+        if "names" in redraw:
+            shown_constellations = visible_constellations(self.constellations, self.const_bounds, matrix,
+                                                          view_center, pixel_scale, view_size)
+        if "lines" in redraw:
+            shown_polylines = visible_polylines(self.edges, matrix, view_center, pixel_scale, view_size)
+        frame = Frame(state, matrix, center, pixel_scale, (self.RA0, self.Dec0), cutoff, tier, on_screen,
+                      shown_constellations, self.edges, shown_polylines, plan)
+        self.update_profiler.lap("culling")
+        return frame
+
+    def pick(self, frame, position, radius=PICK_RADIUS):
+        """
+        Return the star drawn nearest to a pixel position (e.g. the mouse), if one is within radius pixels.
+        Only stars bright enough to be drawn in the frame can be picked.
+
+        Parameters:
+            frame (Frame): Frame returned by prepare.
+            position (tuple): Pixel (x, y) position.
+            radius (float): Largest distance in pixels from the position to the star.
+
+        Returns:
+            Star: The picked star, or None.
+        """
+        index = pick_star(frame.tier.grid, self.stars, frame.matrix, frame.center, frame.pixel_scale,
+                          position, radius, count=frame.cutoff)
+        return None if index is None else self.stars[index]
+
+    def draw(self, surface, state, matrix, center=None, picked=None):
+        """
+        Cull and draw one frame (prepare, then render).
+
+        Parameters:
+            surface (pygame.Surface): Surface to draw on, of the scene size.
+            state (dict): View and display state.
+            matrix (numpy.ndarray): Composite matrix returned by update.
+            center (tuple): Pixel position of the projection center, if not the middle
+                of the surface (e.g. for a tile of a larger map).
+            picked (Star): Optional star to mark, with a tooltip of its details (see pick).
+        """
+        self.render(surface, self.prepare(state, matrix, center), picked)
+
+    def draw_layer(self, surface, name, frame, center):
+        """
+        Draw one layer of a prepared frame ("stars", "names" or "lines"), if the state shows it.
+
+        Parameters:
+            surface (pygame.Surface): Surface to draw on: the frame, or a cached layer surface.
+            name (str): Layer name, one of renderer.layers.LAYERS.
+            frame (Frame): Frame returned by prepare.
+            center (tuple): Pixel position of the projection center on the surface.
+        """
+        state = frame.state
+        pixel_scale = frame.pixel_scale
+        profiler = self.profiler
+
+        if name == "stars":
+            if state["faint_glow"]:
+                draw_aggregates(surface, frame.tier, frame.matrix, center, pixel_scale)
+            self.draw_stars(surface, self.stars, center, pixel_scale, zoom_level=state["scale"], indices=frame.on_screen,
+                            translation=(frame.matrix[0, 2], frame.matrix[1, 2]))
+            profiler.lap("stars")
+            if state["show_hr"]:
+                draw_hr_labels(surface, self.stars, center, pixel_scale, state["scale"], self.fonts["hr"], indices=frame.on_screen)
+                profiler.lap("hr labels")
+        elif name == "names" and state["labels"]:
+            draw_labels(surface, frame.constellations, center, pixel_scale, self.fonts["const"])
+            profiler.lap("names")
+        elif name == "lines" and state["constellations"]:
+            draw_constellations(surface, frame.edges, center, pixel_scale, polylines=frame.polylines,
+                                clip_margin=self.clip_margin)
+            profiler.lap("lines")
+
+    def render(self, surface, frame, picked=None):
+        """
+        Draw a prepared frame. Only the frame and the stars' coordinates are read, so the
+        scene may already be updating for the next frame (see renderer.producer).
+
+        Parameters:
+            surface (pygame.Surface): Surface to draw on, of the scene size.
+            frame (Frame): Frame returned by prepare.
+            picked (Star): Optional star to mark, with a tooltip of its details (see pick).
+        """
+        stars = self.stars
+        state = frame.state
+        matrix = frame.matrix
+        center = frame.center
+        pixel_scale = frame.pixel_scale
+        profiler = self.profiler
+
+        # DRAW (directly, or by compositing the cached layers)
+        if frame.layers is None:
+            surface.fill((0, 0, 0))
+            for name in LAYERS:
+                self.draw_layer(surface, name, frame, center)
+        else:
+            layers = self.layers
+            plan = frame.layers
+            layer_center = layers.center(center, plan["offset"])
+            for name in plan["redraw"]:
+                layer = layers.surfaces[name]
+                layer.fill((0, 0, 0))
+                self.draw_layer(layer, name, frame, layer_center)
+            if plan["compose"]:
+                for name in plan["shown"]:
+                    layers.composite.blit(layers.surfaces[name], (0, 0))
+            dx, dy = plan["offset"]
+            surface.blit(layers.composite, (dx - layers.margin, dy - layers.margin))
+            profiler.lap("layers")
+
+        if picked is not None:
+            # From the unit vector: a selected star may be too faint to be transformed at this zoom,
+            # and the base coordinates may already be projected around the next frame's center
+            x, y = project_unit_vectors(stars.unit[[picked.index]], *frame.projection)
+            x, y, _ = matrix @ np.array([x[0], y[0], 1.0])
+            position = (center[0] - x * pixel_scale, center[1] - y * pixel_scale)
+            draw_tooltip(surface, position, star_info(picked), self.fonts["text"])
+            profiler.lap("tooltip")
+
+        # OVERLAY (with the profiler timings when profiling)
+        if state["overlay"]:
+            hud = profiler.hud_lines() if profiler.enabled else ()
+            self.overlay.draw(surface, state, extra_lines=hud)
+            profiler.lap("overlay")
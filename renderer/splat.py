@@ -0,0 +1,119 @@
+import pygame
+import numpy as np
+from renderer.draw import star_appearance
+
+DENSE_FRACTION = 0.25   # With more covered pixels than this share of the frame, the light is written frame-wide
+
+# Pixel offsets covered by a star disc of each radius, filled on first use (see disc_stamp)
+DISC_STAMPS = {}
+
+# Light surfaces by (size, color, pixel format), with the table of their pixel values (see light_surface)
+LIGHT_SURFACES = {}
+
+
+def disc_stamp(radius):
+    """
+    Pixel offsets (dx, dy) from the top-left corner of the disc of a star of a given radius.
+
+    The disc is drawn once with pygame.draw.circle on a (2 * radius) square, exactly like a
+    star sprite, so both renderers cover the same pixels.
+    """
+    stamp = DISC_STAMPS.get(radius)
+    if stamp is None:
+        square = pygame.Surface((2 * radius, 2 * radius))
+        pygame.draw.circle(square, (255, 255, 255), (radius, radius), radius)
+        stamp = np.nonzero(pygame.surfarray.array_red(square))
+        DISC_STAMPS[radius] = stamp
+    return stamp
+
+
+def light_surface(surface, color):
+    """
+    Return a surface in the pixel format of the target surface to write the star light to,
+    and the table of its pixel values for the color at each opacity from 0 to 255.
+    """
+    key = (surface.get_size(), tuple(color), surface.get_bitsize(), surface.get_masks())
+    light = LIGHT_SURFACES.get(key)
+    if light is None:
+        target = pygame.Surface(surface.get_size(), 0, surface)
+        values = [target.map_rgb(tuple(c * i // 255 for c in color[:3])) for i in range(256)]
+        light = (target, np.array(values, dtype=pygame.surfarray.pixels2d(target).dtype))
+        LIGHT_SURFACES[key] = light
+    return light
+
+
+def splat_stars(surface, stars, center, scale, zoom_level=1.0, color=(255, 255, 255), min_size=1, max_size=3.5, min_alpha=50, max_alpha=255, indices=None, translation=(0, 0)):
+    """
+    Render stars like draw_stars, but with numpy operations on a pixel buffer instead of one blit per star.
+
+    Sizes, opacities and positions are computed for all the stars at once. Every star adds its
+    opacity to each pixel of its disc in an intensity buffer (one np.bincount for all of them),
+    which is written through pygame.surfarray to a light surface and added to the frame in a
+    single blit with BLEND_ADD, saturating at full color. Overlapping stars therefore add up
+    (additive blending), where sprites are composited over each other.
+
+    The cost grows with the number of pixels covered rather than with one Python-level draw
+    call per star, which pays off with large catalogs (see perf/bench_splat.py).
+
+    Parameters:
+        Same as draw_stars, without the sprite cache.
+    """
+    cx, cy = center
+    width, height = surface.get_size()
+
+    indices, size, alpha = star_appearance(stars, zoom_level, min_size, max_size, min_alpha, max_alpha, indices, translation)
+    if not len(indices):
+        return
+
+    # Top-left corner of each disc, as for a sprite
+    left = np.floor(cx - stars.x[indices] * scale - size).astype(np.int64)
+    top = np.floor(cy - stars.y[indices] * scale - size).astype(np.int64)
+
+    # Covered pixels (as offsets into the frame, row by row) and the opacity added to each,
+    # one radius at a time (there are only a few)
+    pixels, weights = [], []
+    for radius in np.unique(size).tolist():
+        same = np.flatnonzero(size == radius)
+        dx, dy = disc_stamp(radius)
+        l = left[same]
+        t = top[same]
+        a = alpha[same]
+
+        # Discs entirely on the frame: the pixels of the stamp shifted to each disc's corner
+        whole = (l >= 0) & (t >= 0) & (l + 2 * radius <= width) & (t + 2 * radius <= height)
+        pixels.append(((t[whole] * width + l[whole])[:, None] + (dy * width + dx)).ravel())
+        weights.append(np.repeat(a[whole], len(dx)))
+
+        # Discs crossing the edges: keep only their pixels on the frame
+        xs = (l[~whole, None] + dx).ravel()
+        ys = (t[~whole, None] + dy).ravel()
+        on_frame = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        pixels.append(ys[on_frame] * width + xs[on_frame])
+        weights.append(np.repeat(a[~whole], len(dx))[on_frame])
+
+    pixels = np.concatenate(pixels)
+    weights = np.concatenate(weights)
+    if not len(pixels):
+        return
+
+    # Write the light in the star color to a surface that BLEND_ADD adds to the frame, saturating at 255
+    light, table = light_surface(surface, color)
+    if len(pixels) > width * height * DENSE_FRACTION:
+        intensity = np.bincount(pixels, weights=weights, minlength=width * height)
+        values = pygame.surfarray.pixels2d(light)
+        values[...] = table[np.minimum(intensity, 255).astype(np.uint8).reshape(height, width)].T
+        del values
+        surface.blit(light, (0, 0), special_flags=pygame.BLEND_ADD)
+        return
+
+    # Few pixels: add up each distinct pixel, and clear and blend only the box around them
+    covered, inverse = np.unique(pixels, return_inverse=True)
+    intensity = np.bincount(inverse, weights=weights)
+    xs = covered % width
+    ys = covered // width
+    box = pygame.Rect(int(xs.min()), int(ys[0]), int(xs.max() - xs.min()) + 1, int(ys[-1] - ys[0]) + 1)
+    light.fill(0, box)
+    values = pygame.surfarray.pixels2d(light)
+    values[xs, ys] = table[np.minimum(intensity, 255).astype(np.uint8)]
+    del values
+    surface.blit(light, box.topleft, box, special_flags=pygame.BLEND_ADD)
@@ -0,0 +1,59 @@
+import pygame
+from collections import OrderedDict
+
+ALPHA_QUANTUM = 4          # Alpha values are rounded to multiples of this
+SPRITE_CACHE_SIZE = 512    # Maximum number of sprites kept
+
+
+class StarSpriteCache():
+    """
+    Pre-rendered star discs, so drawing a star is a single blit instead of allocating a new Surface.
+
+    Sprites are keyed on (color, radius, quantized alpha) and evicted least recently used first.
+
+    Attributes:
+        stats (dict): Cache "hits" and "misses".
+    """
+    def __init__(self, alpha_quantum=ALPHA_QUANTUM, max_sprites=SPRITE_CACHE_SIZE):
+        self.alpha_quantum = alpha_quantum
+        self.max_sprites = max_sprites
+        self.sprites = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def quantize(self, alpha):
+        """
+        Round an alpha value to the cache's alpha quantum, within 0..255.
+        """
+        q = self.alpha_quantum
+        return min(255, max(0, (alpha + q // 2) // q * q))
+
+    def get(self, size, alpha, color=(255, 255, 255)):
+        """
+        Return the sprite for a star disc.
+
+        Parameters:
+            size (int): Disc radius in pixels; the sprite is (2 * size) pixels wide.
+            alpha (int): Disc opacity (0-255).
+            color (tuple): RGB color of the disc.
+
+        Returns:
+            pygame.Surface: Sprite with per-pixel alpha.
+        """
+        key = (color, size, self.quantize(alpha))
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.stats["hits"] += 1
+            self.sprites.move_to_end(key)
+            return sprite
+
+        self.stats["misses"] += 1
+        sprite = pygame.Surface((size*2, size*2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (color[0], color[1], color[2], key[2]), (size, size), size)
+
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+        return sprite
@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+TEXT_CACHE_SIZE = 2048  # Maximum number of rendered strings kept
+
+
+class TextCache():
+    """
+    Bounded cache of rendered text surfaces, so each label is rendered once instead of every frame.
+
+    Surfaces are keyed on (font, text, color, antialias) and evicted least recently used first.
+
+    Attributes:
+        stats (dict): Cache "hits" and "misses".
+    """
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def render(self, font, text, color, antialias=True):
+        """
+        Same as font.render(text, antialias, color), reusing a previously rendered surface when possible.
+        The returned surface is shared: do not draw on it.
+
+        Parameters:
+            font (pygame.font.Font): Font to render with.
+            text (str): Text to render.
+            color (tuple): RGB color of the text.
+            antialias (bool): Whether to antialias the text.
+
+        Returns:
+            pygame.Surface: The rendered text.
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.stats["hits"] += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.stats["misses"] += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
@@ -0,0 +1,130 @@
+import numpy as np
+from scr.transformations import CompiledTransform
+from input.events import build_operations
+from profiling import NULL_PROFILER
+
+# State values that affect the composite matrix, in the order they are compared
+VIEW_KEYS = ("angle", "scale", "reflect_x", "reflect_y", "shx", "shy", "tx", "ty")
+
+# Full recompute after this many consecutive delta updates, so rounding errors cannot pile up
+RESYNC_INTERVAL = 240
+
+
+def view_key(state):
+    """
+    Return a hashable snapshot of the state values that define the view transformation.
+    """
+    return tuple(state[k] for k in VIEW_KEYS)
+
+
+class TransformStage():
+    """
+    Keeps a StarField's transformed coordinates in sync with the view state, doing as little work as possible.
+
+    - If the view state is unchanged, nothing is recomputed (hit).
+    - If only the translation (tx, ty) changed, the offset delta is added to the cached coordinates (partial update).
+    - Otherwise the composite matrix is rebuilt and every star is transformed again (full recompute).
+
+    Only the first count stars (the brightest, see StarField) are kept up to date, plus the
+    pinned stars (e.g. those in constellation lines) wherever they are in the field. The
+    coordinates of the other stars are stale and must not be read.
+
+    Attributes:
+        stars (StarField): Stars whose coordinates are kept up to date.
+        coords (numpy.ndarray): (N, 3) buffer kept up to date: the stars' coords buffer, unless
+            another one was given (e.g. by a FrameProducer, which publishes it to the renderer).
+        matrix (numpy.ndarray): Composite 3x3 matrix matching the current coordinates.
+        valid (int): Number of leading stars whose coordinates are up to date.
+        pinned (numpy.ndarray): Indices of stars that are always kept up to date.
+        stats (dict): Counters for "hits", "partial" updates and "full" recomputes.
+        profiler (StageProfiler): Times the "compose" and "transform" stages.
+    """
+    def __init__(self, stars, profiler=NULL_PROFILER, pinned=None, coords=None):
+        self.stars = stars
+        self.coords = stars.coords if coords is None else coords
+        self.profiler = profiler
+        self.pinned = np.unique(np.asarray(pinned if pinned is not None else [], dtype=np.int64))
+        self.compiled = CompiledTransform()
+        self.matrix = np.eye(3)
+        self.key = None
+        self.valid = 0
+        self.partial_streak = 0
+        self.stats = {"hits": 0, "partial": 0, "full": 0}
+
+    def update(self, state, count=None):
+        """
+        Bring the transformed coordinates up to date with the view state.
+
+        Parameters:
+            state (dict): Transformation state (see input.events.handle_events).
+            count (int): Number of leading stars needed (e.g. a level of detail tier); all by default.
+
+        Returns:
+            numpy.ndarray: The composite 3x3 transformation matrix.
+        """
+        if count is None:
+            count = len(self.stars)
+
+        key = view_key(state)
+        if key == self.key:
+            self.stats["hits"] += 1
+            self.profiler.lap("compose")
+            self.cover(count)
+            return self.matrix
+
+        matrix = self.compiled.compose(build_operations(state))
+        self.profiler.lap("compose")
+
+        # Only tx/ty changed: the linear part is the same, so every star moves by the same offset
+        translation_only = self.key is not None and key[:-2] == self.key[:-2]
+        if translation_only and self.partial_streak < RESYNC_INTERVAL:
+            coords = self.coords
+            dx = matrix[0, 2] - self.matrix[0, 2]
+            dy = matrix[1, 2] - self.matrix[1, 2]
+            coords[:self.valid, 0] += dx
+            coords[:self.valid, 1] += dy
+            pinned = self.pinned_beyond(self.valid)
+            coords[pinned, 0] += dx
+            coords[pinned, 1] += dy
+            self.partial_streak += 1
+            self.stats["partial"] += 1
+        else:
+            self.valid = 0
+            self.stars.transform_indices(matrix, self.pinned_beyond(count), out=self.coords)
+            self.partial_streak = 0
+            self.stats["full"] += 1
+
+        self.key = key
+        np.copyto(self.matrix, matrix)
+        self.cover(count)
+        self.profiler.lap("transform")
+        return self.matrix
+
+    def cover(self, count):
+        """
+        Make sure the first count stars are up to date with the current matrix,
+        transforming only the ones that are not yet (e.g. after zooming in).
+        """
+        if count > self.valid:
+            self.stars.apply_transformation(self.matrix, self.valid, count, out=self.coords)
+            self.valid = count
+
+    def pinned_beyond(self, count):
+        """
+        Pinned star indices outside the first count stars.
+        """
+        return self.pinned[np.searchsorted(self.pinned, count):]
+
+    def pin(self, pinned):
+        """
+        Replace the pinned star indices (e.g. after the constellations were bound again).
+        The pinned stars are transformed on the next update.
+        """
+        self.pinned = np.unique(np.asarray(pinned, dtype=np.int64))
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Force a full recompute on the next update (e.g. after the base coordinates changed).
+        """
+        self.key = None
@@ -1,5 +1,6 @@
 import numpy as np
 import math
+from collections import OrderedDict
 
 
 def rotation_matrix(angle_degrees):
@@ -214,3 +215,173 @@ def compose_transformations(transformations):
         
     return composite
 
+
+
+# Numeric parameters of each transformation type, in the order they are read
+OPERATION_PARAMS = {
+    "rotate": ("angle",),
+    "translate": ("tx", "ty"),
+    "scale": ("sx", "sy"),
+    "shear": ("shx", "shy"),
+    "reflect": (),
+}
+
+# Diagonal of the reflection matrices
+REFLECTION_SIGNS = {"x": (1, -1), "y": (-1, 1), "both": (-1, -1)}
+
+
+def operation_affine(t_type, values, axis=None, xp=math):
+    """
+    Return the top two rows of a transformation matrix as a tuple (a, b, c, d, e, f):
+        [ a  b  c ]
+        [ d  e  f ]
+        [ 0  0  1 ]
+    Same matrices as rotation_matrix, translation_matrix, etc., written out in closed form.
+
+    Parameters:
+        t_type (str): Transformation type (see compose_transformations).
+        values (tuple): Its numeric parameters, in OPERATION_PARAMS order. Floats or numpy arrays.
+        axis (str): Reflection axis, for "reflect".
+        xp (module): math for scalar parameters, numpy for arrays of parameters.
+
+    Returns:
+        tuple: Six coefficients.
+    """
+    if t_type == "rotate":
+        angle_radians = xp.radians(values[0])
+        cos_theta, sin_theta = xp.cos(angle_radians), xp.sin(angle_radians)
+        return (cos_theta, -sin_theta, 0.0, sin_theta, cos_theta, 0.0)
+    elif t_type == "translate":
+        return (1.0, 0.0, values[0], 0.0, 1.0, values[1])
+    elif t_type == "scale":
+        return (values[0], 0.0, 0.0, 0.0, values[1], 0.0)
+    elif t_type == "shear":
+        return (1.0, values[0], 0.0, values[1], 1.0, 0.0)
+    elif t_type == "reflect":
+        if axis not in REFLECTION_SIGNS:
+            raise ValueError("Invalid axis. Use 'x', 'y', or 'both'.")
+        sx, sy = REFLECTION_SIGNS[axis]
+        return (sx, 0.0, 0.0, 0.0, sy, 0.0)
+    else:
+        raise ValueError(f"Invalid transformation type: {t_type}")
+
+
+def affine_product(M, C):
+    """
+    Multiply two affine transformations given as (a, b, c, d, e, f) tuples: returns M @ C.
+    Works element-wise when the coefficients are numpy arrays.
+    """
+    Ma, Mb, Mc, Md, Me, Mf = M
+    Ca, Cb, Cc, Cd, Ce, Cf = C
+    return (
+        Ma*Ca + Mb*Cd, Ma*Cb + Mb*Ce, Ma*Cc + Mb*Cf + Mc,
+        Md*Ca + Me*Cd, Md*Cb + Me*Ce, Md*Cc + Me*Cf + Mf,
+    )
+
+
+def operations_key(transformations):
+    """
+    Split a list of transformations into its structure (types and reflection axes)
+    and its numeric parameters, both as flat tuples.
+    """
+    structure = []
+    values = []
+    for transformation in transformations:
+        t_type = transformation["type"]
+        if t_type not in OPERATION_PARAMS:
+            raise ValueError(f"Invalid transformation type: {t_type}")
+        structure.append((t_type, transformation.get("axis")))
+        for param in OPERATION_PARAMS[t_type]:
+            values.append(transformation[param])
+    return tuple(structure), tuple(values)
+
+
+def compose_affine(structure, values, xp=math):
+    """
+    Fold a transformation structure and its parameters into one affine (a, b, c, d, e, f) tuple.
+    The first transformation is applied first, as in compose_transformations.
+    """
+    composite = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)   # Start with identity matrix
+    i = 0
+    for t_type, axis in structure:
+        n = len(OPERATION_PARAMS[t_type])
+        M = operation_affine(t_type, values[i:i + n], axis, xp)
+        i += n
+        composite = affine_product(M, composite)
+    return composite
+
+
+class CompiledTransform():
+    """
+    Composes transformation lists like compose_transformations, without building any intermediate numpy matrices.
+
+    The composite is folded in closed form over plain floats and written into one reusable 3x3 buffer.
+    Results are cached per (structure, parameters) tuple, so repeated views cost a single lookup.
+
+    Attributes:
+        matrix (numpy.ndarray): Reusable 3x3 buffer returned by compose. Copy it to keep a result.
+        stats (dict): Cache "hits" and "misses".
+    """
+    def __init__(self, cache_size=256):
+        self.matrix = np.eye(3)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.stats = {"hits": 0, "misses": 0}
+
+    def compose(self, transformations):
+        """
+        Compose a list of transformations (see compose_transformations).
+
+        Returns:
+            numpy.ndarray: The composite 3x3 matrix, in the shared buffer.
+        """
+        key = operations_key(transformations)
+        coefficients = self.cache.get(key)
+        if coefficients is None:
+            self.stats["misses"] += 1
+            coefficients = compose_affine(*key)
+            self.cache[key] = coefficients
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.stats["hits"] += 1
+            self.cache.move_to_end(key)
+
+        a, b, c, d, e, f = coefficients
+        self.matrix[0] = (a, b, c)
+        self.matrix[1] = (d, e, f)
+        return self.matrix
+
+    def compose_batch(self, transformations_list, out=None):
+        """
+        Compose K transformation lists at once, e.g. for every frame of an animation.
+        Lists sharing the same structure are folded together over numpy arrays of parameters.
+
+        Parameters:
+            transformations_list (list): K lists of transformations.
+            out (numpy.ndarray): Optional (K, 3, 3) array to write into.
+
+        Returns:
+            numpy.ndarray: (K, 3, 3) composite matrices, in input order.
+        """
+        count = len(transformations_list)
+        if out is None:
+            out = np.empty((count, 3, 3))
+        out[:, 2] = (0.0, 0.0, 1.0)
+
+        groups = {}
+        for i, transformations in enumerate(transformations_list):
+            structure, values = operations_key(transformations)
+            groups.setdefault(structure, ([], []))
+            groups[structure][0].append(i)
+            groups[structure][1].append(values)
+
+        for structure, (indices, values) in groups.items():
+            columns = tuple(np.array(values, dtype=float).reshape(len(indices), -1).T)
+            coefficients = compose_affine(structure, columns, np)
+            rows = out[indices]
+            for k, value in enumerate(coefficients):
+                rows[:, k // 3, k % 3] = value
+            out[indices] = rows
+
+        return out
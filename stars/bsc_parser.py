@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def parse_catalog_line(line):
     """
     Parse a single line of the Bright Star Catalog (BSC) and extract fields.
@@ -87,4 +90,307 @@ def read_bsc_file(filepath):
     except FileNotFoundError:
         print(f"File {filepath} not found.")
 
-    return stars
\ No newline at end of file
+    return stars
+
+
+# Fixed-width layout of the fields decoded by read_bsc_columns: (start, end) byte offsets
+RECORD_LENGTH = 197
+MIN_LINE_LENGTH = 107
+CHUNK_SIZE = 65536  # Records per batch when streaming the catalog
+HR_FIELD = (0, 4)
+NAME_FIELD = (4, 14)
+RA_FIELDS = ((75, 77), (77, 79), (79, 83))
+DE_SIGN_FIELD = (83, 84)
+DE_FIELDS = ((84, 86), (86, 88), (88, 90))
+VMAG_FIELD = (102, 107)
+
+SPACE, PLUS, MINUS, DOT, ZERO, NINE, NEWLINE = (ord(c) for c in " +-.09\n")
+WHITESPACE = np.frombuffer(b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f", dtype=np.uint8)  # ASCII str.isspace()
+# Bytes str.strip() removes, indexed by byte value
+BLANK = np.zeros(256, dtype=bool)
+BLANK[WHITESPACE] = True
+
+
+def read_records(filepath):
+    """
+    Read the whole catalog as one byte buffer and locate its fixed-width records.
+
+    Parameters:
+        filepath (str): Path to the catalog file.
+
+    Returns:
+        tuple: Records as returned by split_records.
+    """
+    with open(filepath, "rb") as file:
+        data = file.read()
+    return split_records(data)
+
+
+def split_records(data):
+    """
+    Locate the fixed-width records in a block of catalog text.
+
+    Catalog lines have their trailing blanks stripped, so bytes past the end of a line
+    are read as blanks (see record_field). Blank lines are dropped, as in read_bsc_file.
+
+    Parameters:
+        data (bytes): Raw catalog text made of whole lines.
+
+    Returns:
+        tuple:
+            - numpy.ndarray: uint8 buffer with the text, padded with blanks.
+            - numpy.ndarray: Offset of each record in the buffer.
+            - numpy.ndarray: Length of each record, without its newline.
+            - numpy.ndarray: Length of each line, counting its newline (as seen by read_bsc_file).
+    """
+    # Same line endings as reading in text mode
+    if b"\r" in data:
+        data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+    buffer = np.frombuffer(data + b" " * RECORD_LENGTH, dtype=np.uint8)
+    size = len(data)
+
+    ends = np.flatnonzero(buffer[:size] == NEWLINE)
+    line_lengths = np.ones(len(ends), dtype=np.int64)
+    if size and data[-1:] != b"\n":
+        ends = np.append(ends, size)
+        line_lengths = np.append(line_lengths, 0)
+    starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)
+    lengths = ends - starts
+    line_lengths += lengths
+
+    # Skip lines made only of whitespace. Catalog records always have a digit at
+    # the end of the HR field, so only lines failing that quick probe are checked in full.
+    probe = buffer[starts + HR_FIELD[1] - 1]
+    keep = (lengths >= HR_FIELD[1]) & ~np.isin(probe, WHITESPACE)
+    for i in np.flatnonzero(~keep):
+        keep[i] = bool(data[starts[i]:starts[i] + lengths[i]].strip())
+
+    return buffer, starts[keep], lengths[keep], line_lengths[keep]
+
+
+def record_field(records, bounds):
+    """
+    Slice one fixed-width field out of every record.
+
+    Parameters:
+        records (tuple): Output of read_records.
+        bounds (tuple): (start, end) byte offsets of the field within a record.
+
+    Returns:
+        numpy.ndarray: (N, end - start) uint8 array with the field bytes.
+    """
+    buffer, starts, lengths, _ = records
+    columns = np.arange(bounds[0], bounds[1])
+    field = buffer[starts[:, None] + columns]
+    short = lengths < bounds[1]
+    if short.any():
+        field[short] = np.where(columns >= lengths[short, None], SPACE, field[short])
+    return field
+
+
+def decode_numeric(field):
+    """
+    Decode a fixed-width numeric field for every record at once.
+
+    Accepts the same text as float() does. Catalog values (an optionally signed decimal
+    number with at most one decimal point, padded with whitespace) are decoded by scanning
+    the field one character position at a time, each step vectorized over all records.
+    The few fields this fast path rejects (exponents, nan, inf, digit separators, ...) are
+    handed to float() one by one.
+
+    Parameters:
+        field (numpy.ndarray): (N, width) uint8 array with the field bytes.
+
+    Returns:
+        tuple:
+            - numpy.ndarray: Decoded float64 values (NaN where invalid).
+            - numpy.ndarray: Boolean mask of records whose field could be decoded.
+    """
+    n = len(field)
+    valid = np.ones(n, dtype=bool)
+    started = np.zeros(n, dtype=bool)     # A non-blank character was seen
+    ended = np.zeros(n, dtype=bool)       # A blank was seen after the number
+    seen_digit = np.zeros(n, dtype=bool)
+    seen_dot = np.zeros(n, dtype=bool)
+    negative = np.zeros(n, dtype=bool)
+    # Integer mantissa and number of decimals, so value = mantissa / 10**decimals matches float() exactly
+    mantissa = np.zeros(n, dtype=np.int64)
+    decimals = np.zeros(n, dtype=np.int64)
+
+    for c in np.ascontiguousarray(field.T):
+        is_space = BLANK[c]
+        is_digit = (c >= ZERO) & (c <= NINE)
+        is_dot = c == DOT
+        is_minus = c == MINUS
+        is_sign = is_minus | (c == PLUS)
+
+        valid &= is_space | is_digit | is_dot | is_sign
+        valid &= is_space | ~ended              # No blanks inside the number
+        valid &= ~(is_sign & started)           # Sign only as the first character
+        valid &= ~(is_dot & seen_dot)           # At most one decimal point
+
+        mantissa = np.where(is_digit, mantissa * 10 + (c - ZERO), mantissa)
+        decimals += is_digit & seen_dot
+        negative |= is_minus
+        seen_digit |= is_digit
+        seen_dot |= is_dot
+        ended |= started & is_space
+        started |= ~is_space
+
+    valid &= seen_digit
+    values = mantissa / 10.0 ** decimals
+    values[negative] *= -1
+    values[~valid] = np.nan
+
+    # Anything else float() accepts
+    for i in np.flatnonzero(started & ~valid):
+        try:
+            values[i] = float(field[i].tobytes().decode("utf-8", "replace"))
+            valid[i] = True
+        except ValueError:
+            pass
+    return values, valid
+
+
+def is_blank(field):
+    """
+    Return a boolean mask of records whose fixed-width field is empty (only whitespace, as for str.strip()).
+    """
+    blank = np.ones(len(field), dtype=bool)
+    for c in field.T:
+        blank &= BLANK[c]
+    return blank
+
+
+def read_bsc_columns(filepath):
+    """
+    Read the Bright Star Catalog in bulk and decode it into typed numpy columns.
+
+    Equivalent to read_bsc_file, but decodes every record with a handful of vectorized
+    operations instead of building one dictionary per star. Lines missing RA/Dec fields
+    are skipped and malformed lines are reported with the same messages.
+
+    Parameters:
+        filepath (str): Path to the catalog file.
+
+    Returns:
+        dict: Columns as returned by decode_records.
+    """
+    try:
+        records = read_records(filepath)
+    except FileNotFoundError:
+        print(f"File {filepath} not found.")
+        records = split_records(b"")
+
+    return decode_records(records)
+
+
+def iter_bsc_chunks(filepath, chunk_size=CHUNK_SIZE, report_errors=True):
+    """
+    Stream the Bright Star Catalog as a sequence of column batches.
+
+    The file is read in blocks of about chunk_size records, so memory use is bounded
+    by the chunk size instead of the catalog size.
+
+    Parameters:
+        filepath (str): Path to the catalog file.
+        chunk_size (int): Approximate number of records per batch.
+        report_errors (bool): Print parse errors, as read_bsc_file does.
+
+    Yields:
+        dict: Columns as returned by decode_records, for one batch of records.
+    """
+    block_size = max(1, chunk_size) * (RECORD_LENGTH + 1)
+    try:
+        with open(filepath, "rb") as file:
+            remainder = b""
+            while True:
+                block = file.read(block_size)
+                if not block:
+                    break
+                # Only hand whole lines to the decoder
+                data = remainder + block
+                cut = data.rfind(b"\n") + 1
+                data, remainder = data[:cut], data[cut:]
+                if data:
+                    yield decode_records(split_records(data), report_errors)
+            if remainder:
+                yield decode_records(split_records(remainder), report_errors)
+    except FileNotFoundError:
+        if report_errors:
+            print(f"File {filepath} not found.")
+
+
+def decode_records(records, report_errors=True):
+    """
+    Decode catalog records into typed numpy columns.
+
+    Parameters:
+        records (tuple): Records as returned by split_records.
+        report_errors (bool): Print parse errors, as read_bsc_file does.
+
+    Returns:
+        dict: Columns of equal length with keys:
+            - hr (numpy.ndarray of int32): Harvard Revised numbers (-1 if blank)
+            - name (numpy.ndarray of str): Common names (if any)
+            - ra_deg (numpy.ndarray of float64): Right Ascension in decimal degrees
+            - dec_deg (numpy.ndarray of float64): Declination in decimal degrees
+            - vmag (numpy.ndarray of float64): Apparent visual magnitudes (NaN if blank)
+    """
+    fields = {}
+    def field(bounds):
+        if bounds not in fields:
+            fields[bounds] = record_field(records, bounds)
+        return fields[bounds]
+
+    line_lengths = records[3]
+    too_short = line_lengths < MIN_LINE_LENGTH
+
+    # Check that all the necessary fields for RA and Dec are present
+    missing = np.zeros(len(line_lengths), dtype=bool)
+    for bounds in RA_FIELDS + DE_FIELDS:
+        missing |= is_blank(field(bounds))
+
+    # Convert RA to decimal degrees (1 hour = 15 degrees)
+    RAh, RAh_ok = decode_numeric(field(RA_FIELDS[0]))
+    RAm, RAm_ok = decode_numeric(field(RA_FIELDS[1]))
+    RAs, RAs_ok = decode_numeric(field(RA_FIELDS[2]))
+    ra_deg = (RAh + RAm/60 + RAs/3600) * 15
+    ra_ok = RAh_ok & RAm_ok & RAs_ok
+
+    # Convert Dec to decimal degrees
+    sign = np.where(field(DE_SIGN_FIELD)[:, 0] == MINUS, -1, 1)
+    DEd, DEd_ok = decode_numeric(field(DE_FIELDS[0]))
+    DEm, DEm_ok = decode_numeric(field(DE_FIELDS[1]))
+    DEs, DEs_ok = decode_numeric(field(DE_FIELDS[2]))
+    dec_deg = sign * (DEd + DEm/60 + DEs/3600)
+    dec_ok = DEd_ok & DEm_ok & DEs_ok
+
+    # Report errors in file order, with the same precedence as parse_catalog_line
+    ra_error = ~too_short & ~missing & ~ra_ok
+    dec_error = ~too_short & ~missing & ra_ok & ~dec_ok
+    errors = np.flatnonzero(too_short | ra_error | dec_error) if report_errors else []
+    for i in errors:
+        if too_short[i]:
+            message = "Line does not meet the minimum required length."
+        elif ra_error[i]:
+            message = "Error converting RA to float."
+        else:
+            message = "Error converting Dec to float."
+        print(f"Error parsing line: {message}")
+
+    keep = ~too_short & ~missing & ra_ok & dec_ok
+
+    hr, hr_ok = decode_numeric(field(HR_FIELD))
+    hr = np.where(hr_ok & np.isfinite(hr), hr, -1).astype(np.int32)
+    vmag, _ = decode_numeric(field(VMAG_FIELD))
+    names = np.char.strip(field(NAME_FIELD).view("S10")[:, 0]).astype("U10")
+
+    return {
+        "hr": hr[keep],
+        "name": names[keep],
+        "ra_deg": ra_deg[keep],
+        "dec_deg": dec_deg[keep],
+        "vmag": vmag[keep],
+    }
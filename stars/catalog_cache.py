@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import numpy as np
+from stars.bsc_parser import read_bsc_columns
+from stars.stars_coords_2d import CATALOG_PATH, project_columns, projection_params, magnitude_mask, stream_columns, unit_vectors
+from profiling import NULL_PROFILER
+
+CACHE_VERSION = 3
+CACHE_DIR = "data/cache"
+META_FILE = "meta.json"
+
+# Columns stored on disk, one .npy file each, sorted by magnitude (brightest first) like a StarField,
+# which can then use the memory-mapped columns as they are
+COLUMNS = {
+    "hr": np.int32,
+    "name": "U10",
+    "vmag": np.float64,
+    "ra_deg": np.float64,
+    "dec_deg": np.float64,
+    "x": np.float64,
+    "y": np.float64,
+    "unit": np.float64,     # (N, 3) unit vectors on the celestial sphere
+}
+
+
+def file_hash(filepath, block_size=1 << 20):
+    """
+    Compute the SHA-256 hash of a file.
+
+    Parameters:
+        filepath (str): Path to the file.
+        block_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: Hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(filepath, max_vmag=None):
+    """
+    Build the key identifying a cached catalog: cache format version,
+    hash of the raw catalog, the projection parameters and the magnitude filter.
+    """
+    return {
+        "version": CACHE_VERSION,
+        "catalog_sha256": file_hash(filepath),
+        "projection": projection_params(),
+        "max_vmag": max_vmag,
+    }
+
+
+def cache_path(filepath, cache_dir=CACHE_DIR, max_vmag=None):
+    """
+    Directory holding the cached columns for a given catalog file and magnitude filter.
+    """
+    name = os.path.basename(filepath)
+    if max_vmag is not None:
+        name = f"{name}_vmag{max_vmag:g}"
+    return os.path.join(cache_dir, name)
+
+
+def load_cache(path, key):
+    """
+    Load cached catalog columns if the stored key matches.
+
+    Columns are memory-mapped read-only, so only the pages actually used are read.
+
+    Parameters:
+        path (str): Cache directory of the catalog.
+        key (dict): Expected cache key (see cache_key).
+
+    Returns:
+        tuple: (columns dict, RA0, Dec0), or None if the cache is missing or stale.
+    """
+    try:
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if meta.get("key") != key:
+        return None
+
+    try:
+        columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in COLUMNS
+        }
+    except (FileNotFoundError, ValueError):
+        return None
+
+    return columns, meta["RA0"], meta["Dec0"]
+
+
+def save_cache(path, key, columns, RA0, Dec0):
+    """
+    Write catalog columns to the cache directory.
+    The metadata file is written last, so an interrupted save is seen as a stale cache.
+
+    Parameters:
+        path (str): Cache directory of the catalog.
+        key (dict): Cache key (see cache_key).
+        columns (dict): Column name -> numpy array.
+        RA0, Dec0 (float): Projection center.
+    """
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    for name in COLUMNS:
+        np.save(os.path.join(path, f"{name}.npy"), columns[name])
+
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"key": key, "RA0": RA0, "Dec0": Dec0, "count": len(columns["hr"])}, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def build_columns(filepath=CATALOG_PATH, chunk_size=None, max_vmag=None, profiler=NULL_PROFILER):
+    """
+    Parse and project the catalog, returning it as typed columns.
+
+    Parameters:
+        filepath (str): Path to the raw catalog file.
+        chunk_size (int): If given, stream the catalog in batches of this many records
+            (see stream_columns) instead of reading it at once.
+        max_vmag (float): Optional faintest magnitude to keep.
+        profiler (StageProfiler): Optional profiler timing the "parse" and "project" stages.
+
+    Returns:
+        tuple: (columns dict, RA0, Dec0), the columns sorted by magnitude, plus the stars' "unit" vectors.
+    """
+    if chunk_size is not None:
+        columns, RA0, Dec0 = stream_columns(filepath, chunk_size, max_vmag)
+        profiler.lap("parse and project")
+    else:
+        columns = read_bsc_columns(filepath)
+        keep = magnitude_mask(columns["vmag"], max_vmag)
+        columns = {name: values[keep] for name, values in columns.items()}
+        profiler.lap("parse")
+        columns["x"], columns["y"], RA0, Dec0 = project_columns(columns["ra_deg"], columns["dec_deg"])
+        profiler.lap("project")
+    # In StarField order, with the unit vectors derived once here
+    order = np.argsort(columns["vmag"], kind="stable")
+    columns = {name: np.asarray(values)[order] for name, values in columns.items()}
+    columns["unit"] = unit_vectors(columns["ra_deg"], columns["dec_deg"]).reshape(-1, 3)
+    columns = {name: np.asarray(columns[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+    return columns, RA0, Dec0
+
+
+def load_catalog(filepath=CATALOG_PATH, cache_dir=CACHE_DIR, use_cache=True, chunk_size=None, max_vmag=None,
+                 profiler=NULL_PROFILER):
+    """
+    Load the projected star catalog as columns, using the on-disk cache when possible.
+    The cache is rebuilt when the catalog file, the projection parameters or the
+    magnitude filter change.
+
+    Parameters:
+        filepath (str): Path to the raw catalog file.
+        cache_dir (str): Root directory for cached catalogs.
+        use_cache (bool): If False, always parse the raw catalog.
+        chunk_size (int): Optional batch size for streaming large catalogs (see build_columns).
+        max_vmag (float): Optional faintest magnitude to keep.
+        profiler (StageProfiler): Optional profiler timing the load stages.
+
+    Returns:
+        tuple: (columns dict, RA0, Dec0)
+    """
+    if not use_cache:
+        return build_columns(filepath, chunk_size, max_vmag, profiler)
+
+    try:
+        key = cache_key(filepath, max_vmag)
+    except FileNotFoundError:
+        return build_columns(filepath, chunk_size, max_vmag, profiler)
+
+    path = cache_path(filepath, cache_dir, max_vmag)
+    cached = load_cache(path, key)
+    profiler.lap("read cache")
+    if cached is not None:
+        return cached
+
+    columns, RA0, Dec0 = build_columns(filepath, chunk_size, max_vmag, profiler)
+    try:
+        save_cache(path, key, columns, RA0, Dec0)
+    except OSError as e:
+        print(f"Could not write catalog cache: {e}")
+    profiler.lap("write cache")
+
+    return columns, RA0, Dec0
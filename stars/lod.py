@@ -0,0 +1,156 @@
+import math
+import numpy as np
+from stars.spatial_index import UniformGrid, EXTENT_PERCENTILES
+
+LOD_STEP = 0.5             # Magnitude step between level of detail tiers
+AGGREGATE_CELLS = 64       # Cells per side of the grid the faint stars are aggregated on
+AGGREGATE_MIN_STARS = 3    # Only cells with at least this many faint stars (dense regions) get an aggregate point
+
+
+class LodTier():
+    """
+    One level of detail: the stars at least as bright as a magnitude limit, plus aggregate
+    points standing for the fainter stars in dense regions.
+
+    Since a StarField is sorted by magnitude, the stars of a tier are its first count stars.
+    The grid and aggregates are built by the LodPyramid when the tier is first used, and
+    are None until then.
+
+    Attributes:
+        limit (float): Faintest magnitude in the tier (inf for the last tier).
+        count (int): Number of stars in the tier.
+        grid (UniformGrid): Spatial index over the base coordinates of the tier's stars.
+        aggregate_base (numpy.ndarray): (M, 3) homogeneous base coordinates of the aggregate points,
+            at the flux-weighted centroid of the faint stars of each dense cell.
+        aggregate_vmag (numpy.ndarray): Combined magnitude of the faint stars of each aggregate point.
+        aggregate_count (numpy.ndarray): Number of faint stars behind each aggregate point.
+    """
+    def __init__(self, limit, count):
+        self.limit = limit
+        self.count = count
+        self.clear()
+
+    def __repr__(self):
+        return (f"LodTier (mag <= {self.limit}: {self.count} stars)")
+
+    def clear(self):
+        """
+        Drop the grid and aggregates, e.g. after the base coordinates changed.
+        """
+        self.grid = None
+        self.aggregate_base = None
+        self.aggregate_vmag = None
+        self.aggregate_count = None
+
+
+class LodPyramid():
+    """
+    Level of detail tiers of a StarField, every LOD_STEP magnitudes.
+
+    Zoomed out, the visibility limit is bright and only a small tier has to be transformed,
+    culled and drawn, however large the catalog is. The last tier holds every star.
+
+    The spatial indexes of a tier are built the first time it is needed and kept until the
+    base coordinates change (see reindex), so after a reprojection only the tiers in use are rebuilt.
+
+    Attributes:
+        stars (StarField): Stars the tiers are prefixes of.
+        tiers (list): LodTier instances, brightest limit first.
+        limits (numpy.ndarray): Magnitude limit of each tier.
+    """
+    def __init__(self, stars, step=LOD_STEP, cells=AGGREGATE_CELLS, min_stars=AGGREGATE_MIN_STARS):
+        self.stars = stars
+        self.cells = cells
+        self.min_stars = min_stars
+        self.cell = None
+
+        first = math.floor(stars.vmag_min / step) * step + step
+        limits = list(np.arange(first, stars.vmag_max, step)) + [math.inf]
+        self.tiers = []
+        for limit in limits:
+            count = len(stars) if math.isinf(limit) else stars.visibility_cutoff(limit)
+            self.tiers.append(LodTier(float(limit), count))
+        self.limits = np.array(limits)
+
+    def __repr__(self):
+        return (f"LodPyramid ({len(self.tiers)} tiers)")
+
+    def __len__(self):
+        return len(self.tiers)
+
+    def tier_for(self, limit):
+        """
+        Return the smallest tier holding every star at least as bright as a magnitude limit,
+        with its spatial indexes built.
+        """
+        index = int(np.searchsorted(self.limits, limit, side="left"))
+        tier = self.tiers[min(index, len(self.tiers) - 1)]
+        if tier.grid is None:
+            self.build(tier)
+        return tier
+
+    def build(self, tier):
+        """
+        Build the grid and aggregate points of a tier over the current base coordinates.
+        """
+        stars = self.stars
+        x = stars.base[:, 0]
+        y = stars.base[:, 1]
+
+        # Faint stars are aggregated on one grid over the whole field
+        if self.cell is None:
+            self.cell = aggregate_cells(x, y, self.cells)
+        known = np.count_nonzero(~np.isnan(stars.vmag))
+
+        count = tier.count
+        tier.grid = UniformGrid(x[:count], y[:count])
+        faint = slice(count, known)
+        aggregates = aggregate_points(x[faint], y[faint], stars.vmag[faint], self.cell[faint], self.min_stars)
+        tier.aggregate_base, tier.aggregate_vmag, tier.aggregate_count = aggregates
+
+    def reindex(self):
+        """
+        Drop the spatial indexes of every tier, after the base coordinates of the stars changed.
+        """
+        self.cell = None
+        for tier in self.tiers:
+            tier.clear()
+
+
+def aggregate_cells(x, y, cells):
+    """
+    Return the aggregation cell of each point, on a cells x cells grid over the bulk of the points.
+    Points outside the grid extent are clamped into the edge cells.
+    """
+    if not len(x):
+        return np.zeros(0, dtype=np.int64)
+    x0, x1 = np.percentile(x, EXTENT_PERCENTILES)
+    y0, y1 = np.percentile(y, EXTENT_PERCENTILES)
+    ix = np.clip(((x - x0) / max(x1 - x0, 1e-9) * cells).astype(np.int64), 0, cells - 1)
+    iy = np.clip(((y - y0) / max(y1 - y0, 1e-9) * cells).astype(np.int64), 0, cells - 1)
+    return iy * cells + ix
+
+
+def aggregate_points(x, y, vmag, cell, min_stars):
+    """
+    Combine the stars of each cell into one point: at the flux-weighted centroid, with the magnitude of their total flux.
+
+    Parameters:
+        x, y (numpy.ndarray): Base coordinates of the stars.
+        vmag (numpy.ndarray): Their magnitudes.
+        cell (numpy.ndarray): Their aggregation cells (see aggregate_cells).
+        min_stars (int): Cells with fewer stars are left out.
+
+    Returns:
+        tuple: (base (M, 3), vmag (M,), count (M,)) of the aggregate points.
+    """
+    flux = 10 ** (-0.4 * vmag)
+    length = int(cell.max()) + 1 if len(cell) else 0
+    total = np.bincount(cell, weights=flux, minlength=length)
+    count = np.bincount(cell, minlength=length)
+    keep = count >= min_stars
+
+    base = np.ones((np.count_nonzero(keep), 3))
+    base[:, 0] = np.bincount(cell, weights=flux * x, minlength=length)[keep] / total[keep]
+    base[:, 1] = np.bincount(cell, weights=flux * y, minlength=length)[keep] / total[keep]
+    return base, -2.5 * np.log10(total[keep]), count[keep]
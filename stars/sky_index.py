@@ -0,0 +1,157 @@
+import math
+import numpy as np
+from stars.stars_coords_2d import unit_vectors
+from stars.spatial_index import STARS_PER_CELL
+
+
+class SkyIndex():
+    """
+    Spatial index over stars on the celestial sphere, for angular queries around any point.
+
+    Each star is a unit vector, bucketed in a uniform 3D grid over the cube [-1, 1]^3 that
+    holds the sphere. A cone of angular radius r around a direction c contains exactly the
+    stars whose unit vector is within a chord of 2 sin(r / 2) of c, so only the cells under
+    the bounding box of that ball are read, and the candidates are tested exactly with dot products.
+    Unlike the UniformGrid over projected coordinates, it does not depend on the projection center.
+
+    Points are stored cell by cell, and the cells of a grid row along x are consecutive,
+    so a query gathers one contiguous slice per row. As the stars lie on the sphere, most
+    cells of the cube are empty; only the occupied ones are kept, so the index grows with
+    the number of stars rather than with the n**3 cells.
+
+    Attributes:
+        unit (numpy.ndarray): (N, 3) unit vectors of the stars.
+        cell_size (float): Side of a cubic cell.
+        n (int): Number of cells along each axis.
+        order (numpy.ndarray): Star indices sorted by cell.
+        cells (numpy.ndarray): Sorted ids of the occupied cells ((iz * n + iy) * n + ix).
+        cell_start (numpy.ndarray): Offset in order where each occupied cell begins (length len(cells) + 1).
+    """
+    def __init__(self, ra_deg, dec_deg, cell_size=None, unit=None):
+        # The unit vectors of the stars can be passed in if already computed (e.g. StarField.unit)
+        if unit is None:
+            unit = unit_vectors(np.asarray(ra_deg, dtype=float), np.asarray(dec_deg, dtype=float)).reshape(-1, 3)
+        self.unit = unit
+        count = len(self.unit)
+
+        # Stars cover the sphere surface (4 pi), not the cube volume
+        if cell_size is None:
+            cell_size = math.sqrt(4 * math.pi * STARS_PER_CELL / max(count, 1))
+        self.n = max(1, math.ceil(2 / cell_size))
+        self.cell_size = 2 / self.n
+
+        ix, iy, iz = self.cell_of(self.unit)
+        cell = (iz * self.n + iy) * self.n + ix
+        self.order = np.argsort(cell, kind="stable")
+        self.cells, counts = np.unique(cell[self.order], return_counts=True)
+        self.cell_start = np.concatenate(([0], np.cumsum(counts)))
+
+    def __repr__(self):
+        return (f"SkyIndex {self.n}x{self.n}x{self.n} cells, {len(self)} stars")
+
+    def __len__(self):
+        return len(self.unit)
+
+    def cell_of(self, vectors):
+        """
+        Return the (ix, iy, iz) cell indices of points, clamped to the grid.
+        """
+        cells = np.clip(np.floor((np.asarray(vectors) + 1) / self.cell_size), 0, self.n - 1).astype(np.int64)
+        return cells[..., 0], cells[..., 1], cells[..., 2]
+
+    def candidates(self, center, chord):
+        """
+        Return the indices of the stars in every cell that intersects the box around a ball.
+
+        Parameters:
+            center (numpy.ndarray): Center of the ball (a unit vector).
+            chord (float): Radius of the ball.
+
+        Returns:
+            numpy.ndarray: Candidate star indices, grouped by cell.
+        """
+        (ix0, iy0, iz0) = self.cell_of(center - chord)
+        (ix1, iy1, iz1) = self.cell_of(center + chord)
+
+        # Occupied cells of every (iy, iz) row of the box, then one slice of order per row
+        iy, iz = np.meshgrid(np.arange(iy0, iy1 + 1), np.arange(iz0, iz1 + 1))
+        rows = ((iz * self.n + iy) * self.n).ravel()
+        starts = self.cell_start[np.searchsorted(self.cells, rows + ix0)]
+        lengths = self.cell_start[np.searchsorted(self.cells, rows + ix1 + 1)] - starts
+
+        # Concatenate the slices without a Python loop: position k of slice j is starts[j] + k
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros(0, dtype=np.int64)
+        shift = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return self.order[np.arange(total) + shift]
+
+    def query_cone(self, ra_deg, dec_deg, radius, count=None):
+        """
+        Return the indices of the stars within an angular radius of a point, in catalog order.
+
+        Parameters:
+            ra_deg, dec_deg (float): Center of the cone in decimal degrees.
+            radius (float): Angular radius of the cone in degrees.
+            count (int): Optional number of leading stars to consider (e.g. the stars brighter
+                than a magnitude limit, which are a prefix of a StarField).
+
+        Returns:
+            numpy.ndarray: Sorted indices of the stars inside the cone.
+        """
+        if count is None:
+            count = len(self)
+        if radius >= 180:
+            return np.arange(count)
+
+        center = unit_vectors(ra_deg, dec_deg)
+        chord = 2 * math.sin(math.radians(max(radius, 0.0)) / 2)
+        candidates = self.candidates(center, chord)
+        candidates = candidates[candidates < count]
+
+        # Exact test: within the radius if the cosine of the angle is at least cos(radius)
+        inside = self.unit[candidates] @ center >= math.cos(math.radians(radius))
+        return np.sort(candidates[inside])
+
+    def cone_mask(self, ra_deg, dec_deg, radius):
+        """
+        Boolean mask over all the stars of the ones within an angular radius of a point (see query_cone).
+        """
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.query_cone(ra_deg, dec_deg, radius)] = True
+        return mask
+
+    def query_nearest(self, ra_deg, dec_deg, k=1, count=None):
+        """
+        Return the k stars closest to a point, nearest first.
+
+        The search starts with a cone expected to hold about 2k stars (if they were spread
+        evenly) and doubles its radius until it holds at least k, so dense regions stop early.
+
+        Parameters:
+            ra_deg, dec_deg (float): Point in decimal degrees.
+            k (int): Number of stars to return.
+            count (int): Optional number of leading stars to consider (see query_cone).
+
+        Returns:
+            tuple: (indices, distances) arrays, distances in degrees; fewer than k if there are fewer stars.
+        """
+        if count is None:
+            count = len(self)
+        k = min(k, count)
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        # Cone with an area of 2k / count of the sphere: 2 pi (1 - cos r) = 4 pi * 2k / count
+        radius = math.degrees(math.acos(max(-1.0, 1 - 4 * k / count)))
+        while True:
+            found = self.query_cone(ra_deg, dec_deg, radius, count)
+            if len(found) >= k or radius >= 180:
+                break
+            radius = min(2 * radius, 180)
+
+        # Angles from the chord length, which stays accurate for very close stars
+        chord = np.linalg.norm(self.unit[found] - unit_vectors(ra_deg, dec_deg), axis=1)
+        distances = np.degrees(2 * np.arcsin(np.minimum(chord / 2, 1)))
+        nearest = np.argsort(distances, kind="stable")[:k]
+        return found[nearest], distances[nearest]
@@ -0,0 +1,80 @@
+import math
+import numpy as np
+
+STARS_PER_CELL = 4          # Average number of stars per grid cell
+EXTENT_PERCENTILES = (0.5, 99.5)  # Grid covers this range; outliers are clamped into the edge cells
+
+
+class UniformGrid():
+    """
+    Uniform grid over 2D points (e.g. the base projected star coordinates) for rectangle queries.
+
+    Points are bucketed by cell and stored cell by cell, so all the points of a run of
+    neighbouring cells in one grid row form a single contiguous slice. Within a cell,
+    points keep their original index order.
+
+    Points outside the grid extent are clamped into the edge cells, so a query returns
+    every point inside the rectangle (plus some nearby ones), never fewer.
+
+    Attributes:
+        x0, y0 (float): Lower corner of the grid.
+        cell_size (float): Side of a square cell.
+        nx, ny (int): Number of cells along x and y.
+        order (numpy.ndarray): Point indices sorted by cell.
+        cell_start (numpy.ndarray): Offset in order where each cell begins (length nx * ny + 1).
+    """
+    def __init__(self, x, y, cell_size=None):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        count = len(x)
+
+        if count:
+            self.x0, x1 = np.percentile(x, EXTENT_PERCENTILES)
+            self.y0, y1 = np.percentile(y, EXTENT_PERCENTILES)
+        else:
+            self.x0 = x1 = self.y0 = y1 = 0.0
+        width = max(x1 - self.x0, 1e-9)
+        height = max(y1 - self.y0, 1e-9)
+
+        if cell_size is None:
+            cell_size = math.sqrt(width * height * STARS_PER_CELL / max(count, 1))
+        self.cell_size = cell_size
+        self.nx = max(1, math.ceil(width / cell_size))
+        self.ny = max(1, math.ceil(height / cell_size))
+
+        ix, iy = self.cell_of(x, y)
+        cell = iy * self.nx + ix
+        self.order = np.argsort(cell, kind="stable")
+        self.cell_start = np.searchsorted(cell[self.order], np.arange(self.nx * self.ny + 1))
+
+    def __repr__(self):
+        return (f"UniformGrid {self.nx}x{self.ny} cells of {self.cell_size:.3f}")
+
+    def cell_of(self, x, y):
+        """
+        Return the (ix, iy) cell indices of points, clamped to the grid.
+        """
+        ix = np.clip(np.floor((np.asarray(x) - self.x0) / self.cell_size), 0, self.nx - 1).astype(np.int64)
+        iy = np.clip(np.floor((np.asarray(y) - self.y0) / self.cell_size), 0, self.ny - 1).astype(np.int64)
+        return ix, iy
+
+    def query_rect(self, xmin, xmax, ymin, ymax):
+        """
+        Return the indices of the points in every cell that intersects a rectangle.
+
+        Parameters:
+            xmin, xmax, ymin, ymax (float): Rectangle bounds in point coordinates.
+
+        Returns:
+            numpy.ndarray: Candidate point indices, grouped by cell.
+        """
+        (ix0, ix1), (iy0, iy1) = self.cell_of([xmin, xmax], [ymin, ymax])
+        slices = []
+        for iy in range(iy0, iy1 + 1):
+            row = iy * self.nx
+            start, end = self.cell_start[row + ix0], self.cell_start[row + ix1 + 1]
+            if end > start:
+                slices.append(self.order[start:end])
+        if not slices:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(slices)
@@ -1,24 +1,60 @@
 import numpy as np
-from stars.stars_coords_2d import stars_coords
+from stars.catalog_cache import load_catalog
+from stars.stars_coords_2d import unit_vectors, project_unit_vectors
+from profiling import NULL_PROFILER
 
 class Star():
     """
     A star in the 2D projection space, with its properties and support for transformation using homogeneous coordinates.
+
+    Stars are lightweight views into a StarField: every attribute is read from (and written to)
+    the field's contiguous columns at this star's index.
     """
-    def __init__(self, HR: int, name: str, vmag: float, x: float, y: float, homogeneous: np.array, ra_deg: float, dec_deg: float):
-        self.hr = HR
-        self.name = name
-        self.vmag = vmag
-        self.x = x
-        self.y = y
-        self.base_homogeneous = homogeneous.copy()  # To reset if needed
-        self.homogeneous = homogeneous.copy()
-        self.ra_deg = ra_deg
-        self.dec_deg = dec_deg
+    __slots__ = ("field", "index")
+
+    def __init__(self, field, index: int):
+        self.field = field
+        self.index = index
 
     def __repr__(self):
         return(f"Star {self.hr}: ({self.x}, {self.y})")
-    
+
+    @property
+    def hr(self):
+        return int(self.field.hr[self.index])
+
+    @property
+    def name(self):
+        return str(self.field.name[self.index])
+
+    @property
+    def vmag(self):
+        return float(self.field.vmag[self.index])
+
+    @property
+    def ra_deg(self):
+        return float(self.field.ra_deg[self.index])
+
+    @property
+    def dec_deg(self):
+        return float(self.field.dec_deg[self.index])
+
+    @property
+    def x(self):
+        return float(self.field.coords[self.index, 0])
+
+    @property
+    def y(self):
+        return float(self.field.coords[self.index, 1])
+
+    @property
+    def base_homogeneous(self):
+        return self.field.base[self.index]
+
+    @property
+    def homogeneous(self):
+        return self.field.coords[self.index]
+
     def apply_transformation(self, matrix: np.array):
         """
         Applies a transformation matrix to this star's base homogeneous coordinate.
@@ -27,28 +63,162 @@ class Star():
         Parameters:
             matrix (np.ndarray): 3x3 transformation matrix.
         """
-        new_homogeneous = matrix @ self.base_homogeneous
-        self.homogeneous = new_homogeneous
-        self.x, self.y = float(new_homogeneous[0]), float(new_homogeneous[1])
-    
-
-def load_stars():
-    """
-    Load star catalog and return list of Star objects with 2D coordinates and homogeneous vectors ready for transformation.
-    """
-    stars_2d, RA0, Dec0 = stars_coords()
-    stars = []
-    for s in stars_2d:
-        star = Star(HR=
-            int(s["HR"]), 
-            name=s["Name"], 
-            vmag=float(s["Vmag"]), 
-            x=s["x"],
-            y=s["y"],
-            homogeneous=s["Homogeneous"],
-            ra_deg=s["RA_deg"],
-            dec_deg=s["Dec_deg"]
-        )
-        stars.append(star)
-
-    return stars, RA0, Dec0
\ No newline at end of file
+        self.field.coords[self.index] = matrix @ self.field.base[self.index]
+
+
+def magnitude_order(vmag):
+    """
+    Return the order that sorts magnitudes brightest first (a stable sort, unknown magnitudes
+    last), or None if they are in that order already.
+    """
+    vmag = np.asarray(vmag)
+    unknown = np.isnan(vmag)
+    known = len(vmag) - int(np.count_nonzero(unknown))
+    if not unknown[:known].any() and not (np.diff(vmag[:known]) < 0).any():
+        return None
+    return np.argsort(vmag, kind="stable")
+
+
+class StarField():
+    """
+    The whole star catalog stored as a struct of arrays.
+    Stars are sorted by magnitude, brightest first.
+
+    Attributes:
+        hr (numpy.ndarray): HR numbers.
+        name (numpy.ndarray): Common names.
+        vmag (numpy.ndarray): Apparent visual magnitudes (ascending).
+        vmag_min, vmag_max (float): Magnitude range of the catalog.
+        ra_deg, dec_deg (numpy.ndarray): Celestial coordinates in decimal degrees.
+        unit (numpy.ndarray): (N, 3) unit vectors on the celestial sphere, for reprojecting.
+        base (numpy.ndarray): (N, 3) projected homogeneous coordinates [x, y, 1], never modified by
+            transformations (only by reproject).
+        coords (numpy.ndarray): (N, 3) buffer with the transformed homogeneous coordinates.
+        lookup (dict): Maps HR number to index in the columns.
+    """
+    def __init__(self, columns):
+        # Keep stars sorted from brightest to faintest, so "every star brighter than X" is a prefix.
+        # Columns already in that order (e.g. memory-mapped from the catalog cache) are used as
+        # they are, without a copy, so processes loading the same cache share their pages.
+        order = magnitude_order(columns["vmag"])
+        take = np.asarray if order is None else (lambda values: np.asarray(values)[order])
+
+        self.hr = take(columns["hr"])
+        self.name = take(columns["name"])
+        self.vmag = take(columns["vmag"])
+        self.ra_deg = take(columns["ra_deg"])
+        self.dec_deg = take(columns["dec_deg"])
+        if "unit" in columns:
+            self.unit = take(columns["unit"])
+        else:
+            self.unit = unit_vectors(self.ra_deg, self.dec_deg)
+
+        # Written by reproject and on every frame, so private to each process
+        self.base = np.ones((len(self.hr), 3))
+        self.base[:, 0] = take(columns["x"])
+        self.base[:, 1] = take(columns["y"])
+        self.coords = self.base.copy()
+
+        # Magnitude range, used to normalize brightness
+        known = self.vmag[~np.isnan(self.vmag)]
+        self.vmag_min = float(known[0]) if len(known) else 0.0
+        self.vmag_max = float(known[-1]) if len(known) else 0.0
+
+        self.lookup = {hr: i for i, hr in enumerate(self.hr.tolist())}
+
+    def __repr__(self):
+        return(f"StarField ({len(self)} stars)")
+
+    def __len__(self):
+        return len(self.hr)
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("StarField index out of range")
+        return Star(self, index % len(self))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield Star(self, i)
+
+    @property
+    def x(self):
+        """Transformed x coordinates (a view into the coords buffer)."""
+        return self.coords[:, 0]
+
+    @property
+    def y(self):
+        """Transformed y coordinates (a view into the coords buffer)."""
+        return self.coords[:, 1]
+
+    def apply_transformation(self, matrix: np.array, start=0, stop=None, out=None):
+        """
+        Applies a transformation matrix to every star at once.
+        The base coordinates are multiplied in one batched product, written in place into the coords buffer.
+
+        Parameters:
+            matrix (np.ndarray): 3x3 transformation matrix.
+            start, stop (int): Optional range of stars to transform (e.g. only the stars brighter
+                than a magnitude limit, which are a prefix); all stars by default.
+            out (np.ndarray): Optional (N, 3) buffer to write to instead of the coords buffer.
+        """
+        out = self.coords if out is None else out
+        np.matmul(self.base[start:stop], matrix.T, out=out[start:stop])
+
+    def transform_indices(self, matrix, indices, out=None):
+        """
+        Applies a transformation matrix to the stars at the given indices only
+        (written to the coords buffer, or to out).
+        """
+        out = self.coords if out is None else out
+        out[indices] = self.base[indices] @ matrix.T
+
+    def reproject(self, RA0, Dec0):
+        """
+        Project the whole catalog again around a new center, writing the base coordinates in place.
+        The transformed coordinates are stale afterwards.
+
+        Parameters:
+            RA0, Dec0 (float): New projection center in decimal degrees.
+        """
+        x, y = project_unit_vectors(self.unit, RA0, Dec0)
+        self.base[:, 0] = x
+        self.base[:, 1] = y
+
+    def visibility_cutoff(self, limit):
+        """
+        Number of stars at least as bright as a magnitude limit, found by binary search.
+        Since stars are sorted by magnitude, these are exactly the first stars of the field.
+
+        Parameters:
+            limit (float): Faintest visible magnitude.
+
+        Returns:
+            int: Index of the first star fainter than the limit.
+        """
+        return int(np.searchsorted(self.vmag, limit, side="right"))
+
+    def star(self, hr):
+        """
+        Return the Star with the given HR number, or None if it is not in the catalog.
+        """
+        index = self.lookup.get(hr)
+        return None if index is None else Star(self, index)
+
+
+def load_stars(use_cache=True, chunk_size=None, max_vmag=None, profiler=NULL_PROFILER):
+    """
+    Load star catalog and return a StarField with 2D coordinates and homogeneous vectors ready for transformation.
+    The parsed and projected catalog is read from the on-disk cache when it is up to date.
+
+    Parameters:
+        use_cache (bool): If False, always parse and project the raw catalog.
+        chunk_size (int): Optional batch size for streaming large catalogs.
+        max_vmag (float): Optional faintest magnitude to keep.
+        profiler (StageProfiler): Optional profiler timing the load stages.
+    """
+    columns, RA0, Dec0 = load_catalog(use_cache=use_cache, chunk_size=chunk_size, max_vmag=max_vmag, profiler=profiler)
+    stars = StarField(columns)
+    profiler.lap("star field")
+
+    return stars, RA0, Dec0
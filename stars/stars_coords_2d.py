@@ -1,46 +1,176 @@
 import numpy as np
 import math
-from stars.bsc_parser import read_bsc_file
+from stars.bsc_parser import read_bsc_file, iter_bsc_chunks, CHUNK_SIZE
 
+CATALOG_PATH = "data/ybsc5"
 
-def angular_distance(ra1, dec1, ra2, dec2):
+# Radial stretch applied after the projection (see radial_stretch_batch)
+STRETCH_R_MAX = 10
+STRETCH_FACTOR = 3
+
+
+def angular_distance_batch(ra1, dec1, ra2, dec2):
     """
-    Compute angular distance between two coordinates: (ra1, dec1) and (ra2, dec2) in degrees.
+    Compute angular distances (in degrees) between arrays of coordinates, element-wise.
+    Either pair may be a scalar, e.g. to measure every star against a single center.
     This uses the spherical law of cosines.
+
+    Parameters:
+        ra1, dec1 (numpy.ndarray or float): First coordinates in decimal degrees.
+        ra2, dec2 (numpy.ndarray or float): Second coordinates in decimal degrees.
+
+    Returns:
+        numpy.ndarray: Angular distances in degrees.
     """
-    ra1, ra2 = math.radians(ra1), math.radians(ra2)
-    dec1, dec2 = math.radians(dec1), math.radians(dec2)
+    ra1, ra2 = np.radians(ra1), np.radians(ra2)
+    dec1, dec2 = np.radians(dec1), np.radians(dec2)
 
-    cos_angle = math.sin(dec1)*math.sin(dec2) + math.cos(dec1)*math.cos(dec2)*math.cos(ra1 - ra2)
-    
-    return math.degrees(math.acos(min(1, max(-1, cos_angle))))
+    cos_angle = np.sin(dec1)*np.sin(dec2) + np.cos(dec1)*np.cos(dec2)*np.cos(ra1 - ra2)
 
+    return np.degrees(np.arccos(np.clip(cos_angle, -1, 1)))
 
-def convert_to_2d(ra_deg, dec_deg, RA0, Dec0):
+
+def convert_to_2d_batch(ra_deg, dec_deg, RA0, Dec0):
     """
-    Project (RA, Dec) onto a 2D plane using stereographic projection centered at (RA0, Dec0).
+    Project arrays of (RA, Dec) onto a 2D plane using stereographic projection centered at (RA0, Dec0).
+
+    Parameters:
+        ra_deg, dec_deg (numpy.ndarray): Star coordinates in decimal degrees.
+        RA0, Dec0 (float): Projection center in decimal degrees.
+
+    Returns:
+        tuple: (x, y) float64 arrays.
     """
     # Convert all angles to radians
-    ra = math.radians(ra_deg)
-    dec = math.radians(dec_deg)
+    ra = np.radians(ra_deg)
+    dec = np.radians(dec_deg)
     ra0 = math.radians(RA0)
     dec0 = math.radians(Dec0)
 
-    # Angular distance between star and center
-    cos_c = math.sin(dec0)*math.sin(dec) + math.cos(dec0)*math.cos(dec)*math.cos(ra - ra0)
-    c = math.acos(min(1, max(-1, cos_c)))   # Clamp for safety
+    sin_dec, cos_dec = np.sin(dec), np.cos(dec)
+    cos_dra = np.cos(ra - ra0)
 
-    if c == 0:
-        return 0, 0
+    # Angular distance between star and center
+    cos_c = math.sin(dec0)*sin_dec + math.cos(dec0)*cos_dec*cos_dra
 
     # Stereographic projection formula
     k = 2 / (1 + cos_c)
-    x = k * math.cos(dec) * math.sin(ra - ra0)
-    y = k * (math.cos(dec0)*math.sin(dec) - math.sin(dec0)*math.cos(dec)*math.cos(ra - ra0))
-    
+    x = k * cos_dec * np.sin(ra - ra0)
+    y = k * (math.cos(dec0)*sin_dec - math.sin(dec0)*cos_dec*cos_dra)
+
+    # Stars exactly at the center
+    at_center = cos_c >= 1
+    x[at_center] = 0
+    y[at_center] = 0
+
     return x, y
 
 
+def unit_vectors(ra_deg, dec_deg):
+    """
+    Convert (RA, Dec) to unit vectors on the celestial sphere.
+
+    Parameters:
+        ra_deg, dec_deg (numpy.ndarray or float): Coordinates in decimal degrees.
+
+    Returns:
+        numpy.ndarray: (..., 3) array of (x, y, z), with z towards the north celestial pole.
+    """
+    ra = np.radians(ra_deg)
+    dec = np.radians(dec_deg)
+    cos_dec = np.cos(dec)
+    return np.stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)], axis=-1)
+
+
+def projection_basis(RA0, Dec0):
+    """
+    Orthonormal basis of a projection centered at (RA0, Dec0), one vector per row:
+    the center, then the directions of growing RA (east) and Dec (north) at the center.
+    """
+    ra0 = math.radians(RA0)
+    dec0 = math.radians(Dec0)
+    return np.array([
+        [math.cos(dec0) * math.cos(ra0), math.cos(dec0) * math.sin(ra0), math.sin(dec0)],
+        [-math.sin(ra0), math.cos(ra0), 0.0],
+        [-math.sin(dec0) * math.cos(ra0), -math.sin(dec0) * math.sin(ra0), math.cos(dec0)],
+    ])
+
+
+def project_unit_vectors(unit, RA0, Dec0):
+    """
+    Stereographic projection centered at (RA0, Dec0) followed by the radial stretch,
+    computed from unit vectors (see unit_vectors). Gives the same result as project_chunk.
+
+    The vectors are expressed in the basis of the projection center with a single (N, 3) x (3, 3)
+    product, so there is no trigonometry per star and the whole catalog can be reprojected every frame.
+
+    Parameters:
+        unit (numpy.ndarray): (N, 3) unit vectors of the stars.
+        RA0, Dec0 (float): Projection center in decimal degrees.
+
+    Returns:
+        tuple: (x, y) float64 arrays.
+    """
+    local = unit @ projection_basis(RA0, Dec0).T
+    cos_c = local[:, 0]
+
+    # Stereographic projection: the east and north components scaled by 2 / (1 + cos c)
+    k = 2 / (1 + cos_c)
+    x = k * local[:, 1]
+    y = k * local[:, 2]
+
+    # Stars exactly at the center
+    at_center = cos_c >= 1
+    x[at_center] = 0
+    y[at_center] = 0
+
+    return radial_stretch_batch(x, y)
+
+
+def radial_stretch_batch(x, y):
+    """
+    Optional radial stretch to spread dense central region outward.
+    This improves visual clarity by making the center less cluttered.
+
+    Parameters:
+        x, y (numpy.ndarray): Projected coordinates.
+
+    Returns:
+        tuple: Stretched (x, y) float64 arrays.
+    """
+    r = np.sqrt(x**2 + y**2)
+
+    # Calculate stretch factor: closer points are stretched more.
+    stretch = 1 + (1 - np.minimum(r / STRETCH_R_MAX, 1)) * STRETCH_FACTOR
+    return x * stretch, y * stretch
+
+
+def angular_distance(ra1, dec1, ra2, dec2):
+    """
+    Compute angular distance between two coordinates: (ra1, dec1) and (ra2, dec2) in degrees.
+    Scalar form of angular_distance_batch.
+    """
+    return float(angular_distance_batch(ra1, dec1, ra2, dec2))
+
+
+def convert_to_2d(ra_deg, dec_deg, RA0, Dec0):
+    """
+    Project (RA, Dec) onto a 2D plane using stereographic projection centered at (RA0, Dec0).
+    Scalar form of convert_to_2d_batch.
+    """
+    x, y = convert_to_2d_batch(np.array([ra_deg]), np.array([dec_deg]), RA0, Dec0)
+    return float(x[0]), float(y[0])
+
+
+def radial_stretch(x, y):
+    """
+    Optional radial stretch to spread dense central region outward.
+    Scalar form of radial_stretch_batch.
+    """
+    x, y = radial_stretch_batch(np.array([x]), np.array([y]))
+    return float(x[0]), float(y[0])
+
+
 def add_homogeneous_coord(x, y):
     """
     Add homogeneous coordinate to (x, y), returning [x, y, 1].
@@ -49,15 +179,30 @@ def add_homogeneous_coord(x, y):
     return np.array([x, y, 1])
 
 
-def stars_coords():
+def projection_params():
+    """
+    Describe the parameters that shape the projected coordinates.
+    Used to invalidate cached catalogs when the projection changes.
+    """
+    return {
+        "projection": "stereographic",
+        "center": "catalog_mean",
+        "stretch_r_max": STRETCH_R_MAX,
+        "stretch_factor": STRETCH_FACTOR,
+    }
+
+
+def stars_coords(filepath=CATALOG_PATH):
     """
     Load star data and project to 2D space using stereographic projection.
     Also compute homogeneous coordinates for matrix transformation support.
 
+    Parameters:
+        filepath (str): Path to the catalog file.
+
     Returns:
     - List of stars with projected coordinates and homogeneous form.
     """
-    filepath = "data/ybsc5"
     stars = read_bsc_file(filepath)
 
     # Use the RA_deg and Dec_deg returned by the parser
@@ -71,26 +216,108 @@ def stars_coords():
     RA0 = sum(ra_list) / len(ra_list)
     Dec0 = sum(dec_list) / len(dec_list)
 
-    # Process each star: convert spherical coordinates to 2D and then compute homogeneous coordinates
-    stars_2d = []
-    for star in stars:
-        x, y = convert_to_2d(star["RA_deg"], star["Dec_deg"], RA0, Dec0)
-
-        # Optional radial stretch to spread dense central region outward.
-        # This improves visual clarity by making the center less cluttered.
-        r = math.sqrt(x**2 + y**2)
-        r_max = 10
-        stretch_factor = 3
+    # Convert spherical coordinates to 2D for the whole catalog at once
+    xs, ys = project_chunk(np.array(ra_list), np.array(dec_list), RA0, Dec0)
 
-        # Calculate stretch factor: closer points are stretched more.
-        stretch = 1 + (1 - min(r / r_max, 1)) * stretch_factor
-        x *= stretch
-        y *= stretch
-
-        # Store transformed coordinates and homogeneous form
+    # Process each star: store 2D coordinates and compute homogeneous coordinates
+    stars_2d = []
+    for star, x, y in zip(stars, xs.tolist(), ys.tolist()):
         star["x"] = x
         star["y"] = y
         star["Homogeneous"] = add_homogeneous_coord(x, y)
         stars_2d.append(star)
 
-    return stars_2d, RA0, Dec0
\ No newline at end of file
+    return stars_2d, RA0, Dec0
+
+
+def project_chunk(ra_deg, dec_deg, RA0, Dec0):
+    """
+    Project a batch of stars to 2D and apply the radial stretch.
+
+    Parameters:
+        ra_deg, dec_deg (numpy.ndarray): Star coordinates in decimal degrees.
+        RA0, Dec0 (float): Projection center in decimal degrees.
+
+    Returns:
+        tuple: (x, y) float64 arrays.
+    """
+    return radial_stretch_batch(*convert_to_2d_batch(ra_deg, dec_deg, RA0, Dec0))
+
+
+def project_columns(ra_deg, dec_deg):
+    """
+    Project catalog columns to 2D, centered at the mean RA/Dec of the catalog.
+
+    Parameters:
+        ra_deg, dec_deg (numpy.ndarray): Star coordinates in decimal degrees.
+
+    Returns:
+        tuple: (x, y, RA0, Dec0) with x and y as float64 arrays.
+    """
+    RA0 = float(np.mean(ra_deg))
+    Dec0 = float(np.mean(dec_deg))
+    x, y = project_chunk(ra_deg, dec_deg, RA0, Dec0)
+    return x, y, RA0, Dec0
+
+
+def magnitude_mask(vmag, max_vmag):
+    """
+    Select the stars at least as bright as max_vmag (all of them if max_vmag is None).
+    """
+    if max_vmag is None:
+        return np.ones(len(vmag), dtype=bool)
+    return vmag <= max_vmag
+
+
+def stream_columns(filepath=CATALOG_PATH, chunk_size=CHUNK_SIZE, max_vmag=None):
+    """
+    Parse, filter and project the catalog in fixed-size batches.
+
+    A first pass counts the stars kept by the magnitude filter and accumulates the
+    projection center. A second pass projects each batch and writes it straight into
+    preallocated columns, so peak memory is bounded by one batch plus the final arrays.
+
+    Parameters:
+        filepath (str): Path to the catalog file.
+        chunk_size (int): Approximate number of records per batch.
+        max_vmag (float): Optional faintest magnitude to keep.
+
+    Returns:
+        tuple: (columns dict, RA0, Dec0), with the same columns as read_bsc_columns plus x and y.
+    """
+    # First pass: size of the output and mean RA/Dec of the kept stars
+    count = 0
+    ra_sum = 0.0
+    dec_sum = 0.0
+    for chunk in iter_bsc_chunks(filepath, chunk_size, report_errors=False):
+        keep = magnitude_mask(chunk["vmag"], max_vmag)
+        count += int(keep.sum())
+        ra_sum += float(chunk["ra_deg"][keep].sum())
+        dec_sum += float(chunk["dec_deg"][keep].sum())
+
+    RA0 = ra_sum / count if count else 0.0
+    Dec0 = dec_sum / count if count else 0.0
+
+    columns = {
+        "hr": np.empty(count, dtype=np.int32),
+        "name": np.empty(count, dtype="U10"),
+        "ra_deg": np.empty(count),
+        "dec_deg": np.empty(count),
+        "vmag": np.empty(count),
+        "x": np.empty(count),
+        "y": np.empty(count),
+    }
+
+    # Second pass: project each batch into its slice of the output columns
+    start = 0
+    for chunk in iter_bsc_chunks(filepath, chunk_size):
+        keep = magnitude_mask(chunk["vmag"], max_vmag)
+        end = start + int(keep.sum())
+        for name in ("hr", "name", "ra_deg", "dec_deg", "vmag"):
+            columns[name][start:end] = chunk[name][keep]
+        columns["x"][start:end], columns["y"][start:end] = project_chunk(
+            columns["ra_deg"][start:end], columns["dec_deg"][start:end], RA0, Dec0
+        )
+        start = end
+
+    return columns, RA0, Dec0